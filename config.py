@@ -49,12 +49,19 @@ STEAM_APP_LIST_PAGE_SIZE = 50000  # max per request
 
 # Cache paths (relative to config file directory)
 _APP_DIR = os.path.dirname(os.path.abspath(__file__))
-STEAM_CACHE_PATH = os.path.join(_APP_DIR, "cache", "steam_reviews.json")
+STEAM_CACHE_PATH = os.path.join(_APP_DIR, "cache", "steam_reviews.jsonl")
 STEAM_CACHE_TTL_HOURS = 24
 STEAM_APP_LIST_CACHE_PATH = os.path.join(_APP_DIR, "cache", "steam_app_list.json")
 STEAM_APP_LIST_TTL_HOURS = 48
-STEAM_APPDETAILS_CACHE_PATH = os.path.join(_APP_DIR, "cache", "steam_appdetails.json")
+STEAM_APPDETAILS_CACHE_PATH = os.path.join(_APP_DIR, "cache", "steam_appdetails.jsonl")
 STEAM_APPDETAILS_CACHE_TTL_HOURS = 168  # 7 days (release date rarely changes)
+STEAM_APPDETAILS_NEGATIVE_TTL_HOURS = 6  # apps the store reports as unavailable (success: false)
+
+# Concurrent per-app fetches (reviews, appdetails, SteamSpy) when enriching the on-sale list.
+# Each service has one limiter shared by all workers (REQUEST_DELAY_SECONDS in steam_client / steamspy_client):
+# the store (reviews + appdetails together) gets at most ~2.5 req/s, SteamSpy at most 1 req/s.
+# Workers overlap request latency and the two services; more workers do not raise either rate.
+STEAM_FETCH_MAX_WORKERS = 8
 
 # Optional feed element name for Steam App ID (e.g. "steamAppId"). Empty = not used.
 FEED_STEAM_APP_ID_TAG = ""
@@ -63,12 +70,14 @@ FEED_STEAM_APP_ID_TAG = ""
 STEAM_MAPPING_PATH = os.path.join(_APP_DIR, "steam_app_ids.json")
 
 # Dedicated cache for name->appid resolution (normalized title -> app_id). Avoids re-resolving same games.
-STEAM_NAME_RESOLUTION_CACHE_PATH = os.path.join(_APP_DIR, "cache", "steam_name_resolution_cache.json")
+# Append-only JSONL (one resolution per line), compacted when it grows well past the number of entries.
+STEAM_NAME_RESOLUTION_CACHE_PATH = os.path.join(_APP_DIR, "cache", "steam_name_resolution.jsonl")
 
 # SteamSpy API (no key); tags per app_id. Use {app_id} placeholder.
 STEAMSPY_APPDETAILS_URL = "https://steamspy.com/api.php?request=appdetails&appid={app_id}"
-STEAMSPY_CACHE_PATH = os.path.join(_APP_DIR, "cache", "steamspy_appdetails.json")
+STEAMSPY_CACHE_PATH = os.path.join(_APP_DIR, "cache", "steamspy_appdetails.jsonl")
 STEAMSPY_CACHE_TTL_HOURS = 168  # 7 days
+STEAMSPY_NEGATIVE_TTL_MINUTES = 5  # failed fetches (network errors, 429/5xx, bad body) before retrying
 
 # Steam review score labels -> minimum percent positive (for filter dropdown)
 STEAM_LABEL_MIN_PERCENT = {
@@ -1,5 +1,6 @@
 """Shared deal filter logic for Deal Finder and Email Builder."""
 
+import operator
 import re
 from datetime import datetime, timezone
 
@@ -10,6 +11,13 @@ from on_sale import _discount_pct_for_currency, _price_for_currency, _sale_end_m
 _ONE_DAY_MS = 86400 * 1000
 
 
+def _row_sale_end_ms(row: dict) -> int | None:
+    """Sale end (Unix ms) precomputed by enrich_with_steam_reviews, else computed from the row's variants."""
+    if "sale_end_ms" in row:
+        return row["sale_end_ms"]
+    return _sale_end_ms(row)
+
+
 def _date_str_to_start_of_day_ms(s: str) -> int | None:
     """Parse YYYY-MM-DD to start-of-day (midnight) UTC timestamp in ms, or None if invalid."""
     s = (s or "").strip()
@@ -61,6 +69,76 @@ def parse_sale_end_value(value_str: str) -> tuple[str, int | None, int | None]:
     return "", None, None
 
 
+def _score_exact(rows: list[dict], score_value: str, label_value: str) -> list[dict]:
+    """Keep rows whose percent positive is within 1 of score_value."""
+    try:
+        target = int(score_value.strip())
+    except (ValueError, TypeError):
+        return rows
+    return [
+        r
+        for r in rows
+        if (pct := r.get("steam_percent_positive")) is not None
+        and abs(pct - target) <= 1
+    ]
+
+
+def _score_operator(rows: list[dict], score_value: str, label_value: str) -> list[dict]:
+    """Keep rows whose percent positive satisfies operator + number (e.g. >75)."""
+    s = (score_value or "").strip()
+    m = re.match(r"^(>=?|<=?|==?|!=)\s*(\d+)$", s)
+    if not m:
+        return rows
+    op, num = m.group(1), int(m.group(2))
+
+    def ok(pct):
+        if pct is None:
+            return False
+        if op == ">":
+            return pct > num
+        if op == ">=":
+            return pct >= num
+        if op == "<":
+            return pct < num
+        if op == "<=":
+            return pct <= num
+        if op == "==":
+            return pct == num
+        if op == "!=":
+            return pct != num
+        return False
+
+    return [r for r in rows if ok(r.get("steam_percent_positive"))]
+
+
+def _score_label(rows: list[dict], score_value: str, label_value: str) -> list[dict]:
+    """Keep rows with the given Steam review label and at least its minimum percent."""
+    if not label_value:
+        return rows
+    min_pct = STEAM_LABEL_MIN_PERCENT.get(label_value)
+    if min_pct is None:
+        return rows
+    return [
+        r
+        for r in rows
+        if (pct := r.get("steam_percent_positive")) is not None
+        and pct >= min_pct
+        and r.get("steam_review_desc") == label_value
+    ]
+
+
+def _keep_rows(rows: list[dict], *_) -> list[dict]:
+    """No-op filter for "All", empty, or unknown filter types."""
+    return rows
+
+
+_SCORE_HANDLERS = {
+    "Exact %": _score_exact,
+    "Operator": _score_operator,
+    "Label": _score_label,
+}
+
+
 def apply_score_filter(
     rows: list[dict],
     filter_type: str,
@@ -68,56 +146,7 @@ def apply_score_filter(
     label_value: str,
 ) -> list[dict]:
     """Filter rows by score: All, Exact %, Operator (e.g. >75), or Label."""
-    if filter_type == "All" or not filter_type:
-        return rows
-    if filter_type == "Exact %":
-        try:
-            target = int(score_value.strip())
-        except (ValueError, TypeError):
-            return rows
-        return [
-            r
-            for r in rows
-            if r.get("steam_percent_positive") is not None
-            and abs(r["steam_percent_positive"] - target) <= 1
-        ]
-    if filter_type == "Operator":
-        s = (score_value or "").strip()
-        m = re.match(r"^(>=?|<=?|==?|!=)\s*(\d+)$", s)
-        if not m:
-            return rows
-        op, num = m.group(1), int(m.group(2))
-
-        def ok(pct):
-            if pct is None:
-                return False
-            if op == ">":
-                return pct > num
-            if op == ">=":
-                return pct >= num
-            if op == "<":
-                return pct < num
-            if op == "<=":
-                return pct <= num
-            if op == "==":
-                return pct == num
-            if op == "!=":
-                return pct != num
-            return False
-
-        return [r for r in rows if ok(r.get("steam_percent_positive"))]
-    if filter_type == "Label" and label_value:
-        min_pct = STEAM_LABEL_MIN_PERCENT.get(label_value)
-        if min_pct is None:
-            return rows
-        return [
-            r
-            for r in rows
-            if r.get("steam_percent_positive") is not None
-            and r["steam_percent_positive"] >= min_pct
-            and (r.get("steam_review_desc") or "") == label_value
-        ]
-    return rows
+    return _SCORE_HANDLERS.get(filter_type, _keep_rows)(rows, score_value, label_value)
 
 
 def apply_reviews_filter(rows: list[dict], min_reviews: str) -> list[dict]:
@@ -193,6 +222,79 @@ def apply_price_filter(rows: list[dict], value_str: str, currency: str = "USD")
     return [r for r in rows if ok(r)]
 
 
+_SORT_KEY = operator.itemgetter(0, 1)
+
+
+def _sale_end_soonest(rows: list[dict], value_str: str) -> list[dict]:
+    """Sort by sale end ascending; rows without sale end last."""
+    keyed = [((ms := _row_sale_end_ms(r)) is None, ms if ms is not None else 0, r) for r in rows]
+    keyed.sort(key=_SORT_KEY)
+    return [t[2] for t in keyed]
+
+
+def _sale_end_latest(rows: list[dict], value_str: str) -> list[dict]:
+    """Sort by sale end descending; rows without sale end last."""
+    keyed = [((ms := _row_sale_end_ms(r)) is None, -ms if ms is not None else 0, r) for r in rows]
+    keyed.sort(key=_SORT_KEY)
+    return [t[2] for t in keyed]
+
+
+def _sale_end_by_date(rows: list[dict], value_str: str) -> list[dict]:
+    """Keep rows whose sale end matches operator + date or falls in a date range."""
+    mode, a, b = parse_sale_end_value(value_str)
+    if mode == "":
+        return rows
+    if mode == "op":
+        op_match = re.match(
+            r"^(>=?|<=?|==?|!=)\s*(\d{4}-\d{2}-\d{2})$", (value_str or "").strip()
+        )
+        op = op_match.group(1) if op_match else "=="
+        start_ms = (
+            _date_str_to_start_of_day_ms(op_match.group(2)) if op_match else None
+        )
+        if start_ms is None:
+            return rows
+        end_ms = start_ms + _ONE_DAY_MS - 1
+        next_day_ms = start_ms + _ONE_DAY_MS
+
+        def ok(row):
+            ms = _row_sale_end_ms(row)
+            if ms is None:
+                return False
+            if op == "<":
+                return ms < start_ms
+            if op == "<=":
+                return ms <= end_ms
+            if op == ">":
+                return ms >= next_day_ms
+            if op == ">=":
+                return ms >= start_ms
+            if op == "==":
+                return start_ms <= ms <= end_ms
+            if op == "!=":
+                return not (start_ms <= ms <= end_ms)
+            return False
+
+        return [r for r in rows if ok(r)]
+    if mode == "range":
+
+        def ok(row):
+            ms = _row_sale_end_ms(row)
+            if ms is None:
+                return False
+            return a <= ms <= b
+
+        return [r for r in rows if ok(r)]
+    return rows
+
+
+_SALE_END_HANDLERS = {
+    "Ending Soon": _sale_end_soonest,
+    "Ending Latest": _sale_end_latest,
+    "By date": _sale_end_by_date,
+}
+
+
 def apply_sale_end_filter(
     rows: list[dict],
     filter_type: str,
@@ -203,58 +305,7 @@ def apply_sale_end_filter(
     value_str used when By date: e.g. <2026-03-01 or 2026-02-01..2026-02-28.
     Rows without sale end (None) are excluded from sort and from By date; for All they stay.
     """
-    if not filter_type or filter_type == "All":
-        return rows
-    if filter_type == "Ending Soon":
-        return sorted(rows, key=lambda r: (_sale_end_ms(r) is None, _sale_end_ms(r) or 0))
-    if filter_type == "Ending Latest":
-        return sorted(rows, key=lambda r: (_sale_end_ms(r) is None, -(_sale_end_ms(r) or 0)))
-    if filter_type == "By date":
-        mode, a, b = parse_sale_end_value(value_str)
-        if mode == "":
-            return rows
-        if mode == "op":
-            op_match = re.match(
-                r"^(>=?|<=?|==?|!=)\s*(\d{4}-\d{2}-\d{2})$", (value_str or "").strip()
-            )
-            op = op_match.group(1) if op_match else "=="
-            start_ms = (
-                _date_str_to_start_of_day_ms(op_match.group(2)) if op_match else None
-            )
-            if start_ms is None:
-                return rows
-            end_ms = start_ms + _ONE_DAY_MS - 1
-            next_day_ms = start_ms + _ONE_DAY_MS
-
-            def ok(row):
-                ms = _sale_end_ms(row)
-                if ms is None:
-                    return False
-                if op == "<":
-                    return ms < start_ms
-                if op == "<=":
-                    return ms <= end_ms
-                if op == ">":
-                    return ms >= next_day_ms
-                if op == ">=":
-                    return ms >= start_ms
-                if op == "==":
-                    return start_ms <= ms <= end_ms
-                if op == "!=":
-                    return not (start_ms <= ms <= end_ms)
-                return False
-
-            return [r for r in rows if ok(r)]
-        if mode == "range":
-
-            def ok(row):
-                ms = _sale_end_ms(row)
-                if ms is None:
-                    return False
-                return a <= ms <= b
-
-            return [r for r in rows if ok(r)]
-    return rows
+    return _SALE_END_HANDLERS.get(filter_type, _keep_rows)(rows, value_str)
 
 
 def apply_deal_filters(
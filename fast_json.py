@@ -0,0 +1,39 @@
+"""JSON encode/decode for the disk caches: orjson when installed, stdlib json otherwise."""
+
+import json
+import mmap
+import os
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Both raise a json.JSONDecodeError (orjson's is a subclass) on malformed input.
+JSONDecodeError = json.JSONDecodeError
+
+if orjson is not None:
+    loads = orjson.loads
+
+    def dumps(obj) -> bytes:
+        """Serialize obj to compact UTF-8 JSON bytes."""
+        return orjson.dumps(obj)
+
+else:
+    loads = json.loads
+
+    def dumps(obj) -> bytes:
+        """Serialize obj to compact UTF-8 JSON bytes."""
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+# Files at least this large are parsed from an mmap (orjson only) instead of being read into a bytes copy first.
+_MMAP_MIN_BYTES = 256 * 1024
+
+
+def load_file(f):
+    """Parse the JSON document in binary file object f."""
+    if orjson is not None and os.fstat(f.fileno()).st_size >= _MMAP_MIN_BYTES:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+            return orjson.loads(view)
+    return loads(f.read())
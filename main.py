@@ -11,7 +11,6 @@ import threading
 import time
 import webbrowser
 from datetime import datetime, timezone
-from zoneinfo import ZoneInfo
 
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox, filedialog, simpledialog
@@ -54,6 +53,7 @@ from on_sale import (
     _sale_end_ms,
     _sale_end_str,
     _release_date_str,
+    _ET,
 )
 from tksheet import Sheet
 from steam_cache import clear as clear_steam_cache
@@ -192,6 +192,7 @@ def _ensure_steam_reviews_for_email(pool: list[dict]) -> None:
             g["steam_percent_positive"] = None
         g["steam_review_desc"] = (summary.get("review_score_desc") or "").strip() or None
         g["steam_total_reviews"] = total_reviews
+        g.pop("_tab2_cells", None)  # Rating/Reviews changed; re-format on next Deal Finder display
 
 
 def _post_header_image_url(game: dict) -> str:
@@ -291,8 +292,7 @@ def _format_offer_ends_est(ms: int | None) -> str:
     if ms is None:
         return ""
     try:
-        est = ZoneInfo("America/New_York")
-        dt = datetime.fromtimestamp(ms / 1000.0, tz=timezone.utc).astimezone(est)
+        dt = datetime.fromtimestamp(ms / 1000.0, tz=_ET)
         return dt.strftime("%b %d, %Y %I:%M %p EST")
     except (ValueError, OSError):
         return ""
@@ -310,14 +310,68 @@ def _lerp_hex(hex_a: str, hex_b: str, t: float) -> str:
     return f"#{r:02x}{g:02x}{bl:02x}"
 
 
+def _color_scale_hex(t: float) -> str:
+    """Map t in [0, 1] to green -> yellow -> orange -> red (hex)."""
+    if t <= 0:
+        return "#d4edda"
+    if t >= 1:
+        return "#f8d7da"
+    if t < 0.33:
+        u = t / 0.33
+        return _lerp_hex("#d4edda", "#fff3cd", u)
+    if t < 0.66:
+        u = (t - 0.33) / 0.33
+        return _lerp_hex("#fff3cd", "#ffe5b4", u)
+    u = (t - 0.66) / 0.34
+    return _lerp_hex("#ffe5b4", "#f8d7da", u)
+
+
+# Color scale sampled once at import; cell coloring indexes this instead of interpolating per cell.
+# 256 steps is finer than the 8-bit channel deltas between stops, so the result is visually identical.
+_COLOR_SCALE_STEPS = 256
+_COLOR_SCALE_LUT = tuple(_color_scale_hex(i / (_COLOR_SCALE_STEPS - 1)) for i in range(_COLOR_SCALE_STEPS))
+
+
+def _tab2_static_cells(row: dict) -> tuple[str, ...]:
+    """
+    Deal Finder cells that do not depend on currency/coupon: (title, rating, reviews, release date,
+    sale end, developer, publisher, tags). Formatted once per row and cached on the row as "_tab2_cells",
+    so re-filtering only recomputes the % Off and Price columns.
+    """
+    cells = row.get("_tab2_cells")
+    if cells is not None:
+        return cells
+    title = (row.get("title") or "").strip() or "—"
+    pct = row.get("steam_percent_positive")
+    desc = row.get("steam_review_desc") or ""
+    if pct is not None and desc:
+        rating = f"{desc} ({pct}%)"
+    elif desc:
+        rating = desc
+    elif pct is not None:
+        rating = f"{pct}%"
+    else:
+        rating = "N/A"
+    reviews = row.get("steam_total_reviews")
+    reviews_str = str(reviews) if reviews is not None and reviews > 0 else "N/A"
+    developer_str = (row.get("steam_developer") or "").strip() or "—"
+    publisher_str = (row.get("steam_publisher") or "").strip() or "—"
+    tags_raw = row.get("steam_tags")
+    if isinstance(tags_raw, list):
+        tags_str = ", ".join(str(t).strip() for t in tags_raw if t and str(t).strip()) or "—"
+    else:
+        tags_str = (tags_raw or "").strip() or "—"
+    cells = (title, rating, reviews_str, _release_date_str(row), _sale_end_str(row), developer_str, publisher_str, tags_str)
+    row["_tab2_cells"] = cells
+    return cells
+
+
+_URL_SPLIT_RE = re.compile(r"[,\n\r]+")
+
+
 def parse_pasted_urls(text: str) -> list[str]:
     """Split pasted text into URLs (newline or comma separated), strip whitespace."""
-    urls = []
-    for part in text.replace(",", "\n").splitlines():
-        u = part.strip()
-        if u:
-            urls.append(u)
-    return urls
+    return [u for u in (p.strip() for p in _URL_SPLIT_RE.split(text)) if u]
 
 
 def _release_date_ms(row: dict) -> int | None:
@@ -615,6 +669,9 @@ class Application:
         self._index = None
         self._on_sale_rows = []  # Enriched on-sale list for tab 2
         self._tab2_displayed_rows = []  # Last rows shown (for Copy URLs)
+        self._last_tab2_widths = None  # Column widths last pushed to the Deal Finder sheet
+        self._tab2_resize_after_id = None  # Pending coalesced resize (see _schedule_tab2_resize)
+        self._filter_after_id = None  # Pending debounced filter run (see _schedule_filter)
         self._post_builder_displayed_rows = []  # Generated posts for Post Builder tab
         self._post_auto_last_run = 0.0  # For interval-based auto-generation
         self._post_append_mode = False  # True when auto-tick run: append generated posts
@@ -675,7 +732,7 @@ class Application:
         self.tab2_search_var = tk.StringVar(value="")
         search_entry = ttk.Entry(search_frame, textvariable=self.tab2_search_var, width=22)
         search_entry.pack(side=tk.LEFT, padx=(0, 8))
-        search_entry.bind("<Return>", lambda e: self._apply_filters_tab2())
+        search_entry.bind("<Return>", self._schedule_filter)
 
         # Filters (collapsible)
         self._filters_visible = True
@@ -716,7 +773,7 @@ class Application:
         ttk.Label(filt_frame, text="Coupon %:").grid(row=0, column=12, sticky=tk.W, padx=(16, 4))
         self.tab2_coupon_var = tk.StringVar(value="0")
         ttk.Spinbox(filt_frame, from_=0, to=50, width=5, textvariable=self.tab2_coupon_var).grid(row=0, column=13, sticky=tk.W, padx=(0, 8))
-        ttk.Button(filt_frame, text="Apply filters", command=self._apply_filters_tab2).grid(row=0, column=14, padx=(8, 0))
+        ttk.Button(filt_frame, text="Apply filters", command=self._schedule_filter).grid(row=0, column=14, padx=(8, 0))
 
         # Sale end filter (row 1)
         ttk.Label(filt_frame, text="Sale end:").grid(row=1, column=0, sticky=tk.W, padx=(0, 4), pady=(8, 0))
@@ -774,7 +831,7 @@ class Application:
         self.tab2_sheet.enable_bindings()
         self.tab2_sheet.bind("<Double-1>", self._on_tab2_sheet_double_click)
         self.tab2_sheet.grid(row=0, column=0, sticky="nswe")
-        self.tab2_sheet_frame.bind("<Configure>", self._resize_tab2_columns)
+        self.tab2_sheet_frame.bind("<Configure>", self._schedule_tab2_resize)
         self.root.after(100, self._resize_tab2_columns)
         ttk.Label(tab2, text="Double-click a row to open the product page.", font=("TkDefaultFont", 8)).pack(anchor=tk.W)
         btn_frame = ttk.Frame(tab2)
@@ -1898,7 +1955,7 @@ class Application:
             messagebox.showwarning("No preview", "Build preview first, then you can use Update preview for quick changes.")
             return
         self.email_status_var.set("Updating…")
-        self.root.update()
+        self.root.update_idletasks()
         try:
             pool = self._email_game_pool
             for p in pool:
@@ -1962,7 +2019,7 @@ class Application:
             messagebox.showwarning("No index", "Feed index is required for Re-pick. Load feed and build preview first.")
             return
         self.email_status_var.set("Re-picking…")
-        self.root.update()
+        self.root.update_idletasks()
         try:
             pool = self._email_game_pool
             for p in pool:
@@ -2066,7 +2123,9 @@ class Application:
         return [c for c in ALL_CURRENCIES if self.currency_vars[c].get()]
 
     def _process_worker_queue(self):
-        """Process messages from worker thread (progress, done, error). Must run on main thread."""
+        """Process messages from worker thread (progress, done, error). Must run on main thread.
+        Progress messages are coalesced: only the latest text per target is shown once the queue is drained."""
+        pending_progress = {}
         while True:
             try:
                 msg = self._worker_queue.get_nowait()
@@ -2075,13 +2134,11 @@ class Application:
             kind = msg[0] if isinstance(msg, (list, tuple)) else msg
             if kind == "progress":
                 _, target, text = msg
-                if target == "tab2":
-                    self.tab2_status.config(text=text)
-                elif target == "email":
-                    self.email_status_var.set(text)
-                elif target == "post":
-                    self.post_status_var.set(text)
-            elif kind == "done":
+                pending_progress[target] = text
+            elif kind in ("done", "error"):
+                # Progress always precedes done/error; don't let it overwrite the final status
+                pending_progress.clear()
+            if kind == "done":
                 _, op, payload = msg
                 if op == "load_feed":
                     self._feed_items, self._index = payload
@@ -2166,6 +2223,13 @@ class Application:
                     messagebox.showerror("Error", str(e))
                     import traceback
                     traceback.print_exc()
+        for target, text in pending_progress.items():
+            if target == "tab2":
+                self.tab2_status.config(text=text)
+            elif target == "email":
+                self.email_status_var.set(text)
+            elif target == "post":
+                self.post_status_var.set(text)
         if self._worker_busy:
             self.root.after(50, self._process_worker_queue)
 
@@ -2268,24 +2332,38 @@ class Application:
             scrollbar_w = 20
             total = max(100, w - scrollbar_w)
             widths = [max(40, int(total * r)) for r in self._tab2_column_ratios]
+            if widths == self._last_tab2_widths:
+                return
             self.tab2_sheet.set_column_widths(column_widths=widths)
+            self._last_tab2_widths = widths
         except (tk.TclError, AttributeError):
             pass
 
+    def _schedule_tab2_resize(self, event=None):
+        """Debounce <Configure> bursts (window drags): resize columns once after 30 ms without events."""
+        if self._tab2_resize_after_id is not None:
+            self.root.after_cancel(self._tab2_resize_after_id)
+        def run():
+            self._tab2_resize_after_id = None
+            self._resize_tab2_columns()
+        self._tab2_resize_after_id = self.root.after(30, run)
+
+    def _schedule_filter(self, *_):
+        """Debounce filter triggers (Return key, Apply button): re-filter and repopulate once after 80 ms."""
+        if self._filter_after_id is not None:
+            self.root.after_cancel(self._filter_after_id)
+        def run():
+            self._filter_after_id = None
+            self._apply_filters_tab2()
+        self._filter_after_id = self.root.after(80, run)
+
     def _value_to_color(self, t: float) -> str:
-        """Map t in [0, 1] to green -> yellow -> orange -> red (hex)."""
+        """Map t in [0, 1] to green -> yellow -> orange -> red (hex), via the precomputed lookup table."""
         if t <= 0:
-            return "#d4edda"
+            return _COLOR_SCALE_LUT[0]
         if t >= 1:
-            return "#f8d7da"
-        if t < 0.33:
-            u = t / 0.33
-            return _lerp_hex("#d4edda", "#fff3cd", u)
-        if t < 0.66:
-            u = (t - 0.33) / 0.33
-            return _lerp_hex("#fff3cd", "#ffe5b4", u)
-        u = (t - 0.66) / 0.34
-        return _lerp_hex("#ffe5b4", "#f8d7da", u)
+            return _COLOR_SCALE_LUT[-1]
+        return _COLOR_SCALE_LUT[int(t * (_COLOR_SCALE_STEPS - 1) + 0.5)]
 
     def _populate_tab2_sheet(self, rows: list[dict]):
         self._tab2_displayed_rows = rows
@@ -2296,34 +2374,14 @@ class Application:
             coupon = 0.0
         data = []
         for r in rows:
-            title = (r.get("title") or "").strip() or "—"
-            pct = r.get("steam_percent_positive")
-            desc = r.get("steam_review_desc") or ""
-            if pct is not None and desc:
-                rating = f"{desc} ({pct}%)"
-            elif desc:
-                rating = desc
-            elif pct is not None:
-                rating = f"{pct}%"
-            else:
-                rating = "N/A"
-            reviews = r.get("steam_total_reviews")
-            reviews_str = str(reviews) if reviews is not None and reviews > 0 else "N/A"
+            title, rating, reviews_str, release_str, sale_end_str, developer_str, publisher_str, tags_str = _tab2_static_cells(r)
             dp = _discount_pct_after_coupon(r, currency, coupon)
             discount_str = f"{dp}%" if dp is not None else ""
             price_val = _price_after_coupon(r, currency, coupon)
             price_str = f"{price_val:.2f}" if price_val is not None else "—"
-            release_str = _release_date_str(r)
-            sale_end_str = _sale_end_str(r)
-            developer_str = (r.get("steam_developer") or "").strip() or "—"
-            publisher_str = (r.get("steam_publisher") or "").strip() or "—"
-            tags_raw = r.get("steam_tags")
-            if isinstance(tags_raw, list):
-                tags_str = ", ".join(str(t).strip() for t in tags_raw if t and str(t).strip()) or "—"
-            else:
-                tags_str = (tags_raw or "").strip() or "—"
             data.append([title, rating, reviews_str, discount_str, price_str, release_str, sale_end_str, developer_str, publisher_str, tags_str])
-        self.tab2_sheet.set_sheet_data(data)
+        self.tab2_sheet.set_sheet_data(data, redraw=False)
+        self._last_tab2_widths = None  # set_sheet_data resets column positions; re-apply widths
         self._apply_tab2_color_scale(rows)
         self._resize_tab2_columns()
         self.tab2_sheet.refresh()
@@ -2358,6 +2416,8 @@ class Application:
             lo, hi = min(numeric), max(numeric)
             span = hi - lo if hi > lo else 1.0
             sheet_col = col_idx + 1
+            # Group cells by color so each (column, color) is one highlight call instead of one per cell
+            cells_by_color: dict[str, list[tuple[int, int]]] = {}
             for row_idx in range(n):
                 v = vals[row_idx]
                 if v is None:
@@ -2365,7 +2425,9 @@ class Application:
                 # Price (col 4): invert so lower price = red, higher price = green
                 t = (hi - v) / span if col_idx == 3 else (v - lo) / span
                 color = self._value_to_color(t)
-                self.tab2_sheet[(row_idx, sheet_col)].bg = color
+                cells_by_color.setdefault(color, []).append((row_idx, sheet_col))
+            for color, cells in cells_by_color.items():
+                self.tab2_sheet.highlight_cells(cells=cells, bg=color, redraw=False)
 
     def _on_tab2_sheet_double_click(self, event=None):
         """Open the selected row's product page in the default browser."""
@@ -2460,19 +2522,8 @@ class Application:
         rating_vals, review_vals, discount_vals, partner_discount_vals, price_vals, partner_price_vals = [], [], [], [], [], []
         row_dicts = []
         for r in rows:
-            title = (r.get("title") or "").strip() or "—"
+            title, rating, reviews_str, release_str, sale_end_str, developer_str, publisher_str, tags_str = _tab2_static_cells(r)
             pct = r.get("steam_percent_positive")
-            desc = r.get("steam_review_desc") or ""
-            if pct is not None and desc:
-                rating = f"{desc} ({pct}%)"
-            elif desc:
-                rating = desc
-            elif pct is not None:
-                rating = f"{pct}%"
-            else:
-                rating = "N/A"
-            reviews = r.get("steam_total_reviews")
-            reviews_str = str(reviews) if reviews is not None and reviews > 0 else "N/A"
             dp = _discount_pct_after_coupon(r, currency, coupon)
             discount_str = f"{dp}%" if dp is not None else ""
             price_val = _price_after_coupon(r, currency, coupon)
@@ -2481,15 +2532,6 @@ class Application:
             partner_discount_str = f"{pdp}%" if pdp is not None else ""
             partner_price_val = _price_after_coupon(r, currency, partner_discount)
             partner_price_str = f"{partner_price_val:.2f}" if partner_price_val is not None else "—"
-            release_str = _release_date_str(r)
-            sale_end_str = _sale_end_str(r)
-            developer_str = (r.get("steam_developer") or "").strip() or "—"
-            publisher_str = (r.get("steam_publisher") or "").strip() or "—"
-            tags_raw = r.get("steam_tags")
-            if isinstance(tags_raw, list):
-                tags_str = ", ".join(str(t).strip() for t in tags_raw if t and str(t).strip()) or "—"
-            else:
-                tags_str = (tags_raw or "").strip() or "—"
             row_dicts.append({
                 "Game": title, "Rating": rating, "Reviews": reviews_str,
                 "% Off": discount_str, "Partner % Off": partner_discount_str,
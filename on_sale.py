@@ -1,23 +1,19 @@
 """Get products currently on sale from the index; resolve Steam App ID by name when needed."""
 
-from datetime import datetime, timezone
+from bisect import insort
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from functools import lru_cache
 from zoneinfo import ZoneInfo
 
-from config import STEAM_WEB_API_KEY
-from steam_app_list import get_app_list, resolve_name_to_app_id_cached
+from config import STEAM_FETCH_MAX_WORKERS, STEAM_WEB_API_KEY
+from steam_app_list import batch_resolution_writes, get_app_list, resolve_name_to_app_id_cached
+from steam_appdetails_cache import batch_writes as batch_appdetails_writes
 from steam_client import fetch_app_reviews, fetch_app_details_full
-from steamspy_client import fetch_steamspy_appdetails
+from steamspy_client import fetch_steamspy_appdetails, flush_steamspy_cache
 
-
-def _is_on_sale(product: dict) -> bool:
-    """True if at least one variant has discountPrice or discountPercentage."""
-    variants = product.get("variants_by_currency") or {}
-    for v in variants.values():
-        if v.get("discountPrice") is not None:
-            return True
-        if (v.get("discountPercentage") or "").strip():
-            return True
-    return False
+# Sale end times are shown in US Eastern; resolve the zone once instead of per formatted row.
+_ET = ZoneInfo("America/New_York")
 
 
 def _discount_pct(product: dict) -> int | None:
@@ -25,14 +21,21 @@ def _discount_pct(product: dict) -> int | None:
     variants = product.get("variants_by_currency") or {}
     best = None
     for v in variants.values():
-        pct = (v.get("discountPercentage") or "").strip()
-        if pct:
+        raw = v.get("discountPercentage")
+        if isinstance(raw, int):
+            n = raw
+        else:
+            pct = (raw or "").strip()
+            if not pct:
+                continue
             try:
                 n = int(pct)
-                if best is None or n > best:
-                    best = n
             except ValueError:
-                pass
+                continue
+        if n >= 100:
+            return 100  # Percentages top out at 100; no variant can beat it
+        if best is None or n > best:
+            best = n
     return best
 
 
@@ -140,44 +143,148 @@ def _sale_end_str(product: dict) -> str:
     latest_ms = _sale_end_ms(product)
     if latest_ms is None:
         return "—"
+    return _format_sale_end_minute(latest_ms // 60000)
+
+
+@lru_cache(maxsize=4096)
+def _format_sale_end_minute(minute: int) -> str:
+    """Format a Unix minute as an ET date/time string; memoized since many sales end on the same minute."""
     try:
-        dt_utc = datetime.fromtimestamp(latest_ms / 1000.0, tz=timezone.utc)
-        dt_eastern = dt_utc.astimezone(ZoneInfo("America/New_York"))
-        return dt_eastern.strftime("%Y-%m-%d %I:%M %p ET")
+        return datetime.fromtimestamp(minute * 60, tz=_ET).strftime("%Y-%m-%d %I:%M %p ET")
     except (ValueError, OSError):
         return "—"
 
 
+def _summarize_variants(product: dict) -> tuple[bool, int | None]:
+    """
+    One pass over variants_by_currency: (on_sale, latest sale end Unix ms).
+    A product is on sale if any variant has a discountPrice or a discountPercentage (an int, or a non-blank string).
+    The sale end is the latest parseable discountEndDate.
+    """
+    variants = product.get("variants_by_currency") or {}
+    on_sale = False
+    latest_ms = None
+    for v in variants.values():
+        if not on_sale:
+            if v.get("discountPrice") is not None:
+                on_sale = True
+            else:
+                raw = v.get("discountPercentage")
+                if isinstance(raw, int) or (raw and raw.strip()):
+                    on_sale = True
+        raw = v.get("discountEndDate")
+        if raw is not None:
+            try:
+                ms = int(raw) if isinstance(raw, (int, float)) else int(str(raw).strip())
+                if latest_ms is None or ms > latest_ms:
+                    latest_ms = ms
+            except (ValueError, TypeError):
+                pass
+    return on_sale, latest_ms
+
+
 def _release_date_str(product: dict) -> str:
     """Release date from Steam appdetails, or "—" if not available."""
     return product.get("steam_release_date") or "—"
 
 
+def iter_on_sale_products(index: dict[str, dict]):
+    """
+    Yield (product, sale end Unix ms or None) for index products that are currently on sale.
+    Products are yielded as-is (no Steam name resolution, no added keys).
+    """
+    for p in index.values():
+        is_on_sale, end_ms = _summarize_variants(p)
+        if is_on_sale:
+            yield p, end_ms
+
+
 def get_on_sale_products(index: dict[str, dict], resolve_steam_by_name: bool = True) -> list[dict]:
     """
     Return list of products that are currently on sale (any variant has discount).
     Products are dicts with title, link, platform, variants_by_currency, steam_app_id.
     If resolve_steam_by_name is True and STEAM_WEB_API_KEY is set, products without
     steam_app_id get it resolved via Steam app list name match.
+    Sets "sale_end_ms" on each returned product (computed in the same pass as the on-sale check),
+    so enrichment and sale-end sorting don't rescan variants.
     """
-    on_sale = [p for p in index.values() if _is_on_sale(p)]
+    on_sale = []
+    for p, end_ms in iter_on_sale_products(index):
+        p["sale_end_ms"] = end_ms
+        on_sale.append(p)
     if not resolve_steam_by_name or not (STEAM_WEB_API_KEY and STEAM_WEB_API_KEY.strip()):
         return on_sale
     app_list = get_app_list()
     if not app_list:
         return on_sale
-    for p in on_sale:
-        if p.get("steam_app_id") is not None:
-            continue
-        title = (p.get("title") or "").strip()
-        if not title:
-            continue
-        app_id = resolve_name_to_app_id_cached(title, app_list)
-        if app_id is not None:
-            p["steam_app_id"] = app_id
+    with batch_resolution_writes():
+        for p in on_sale:
+            if p.get("steam_app_id") is not None:
+                continue
+            title = (p.get("title") or "").strip()
+            if not title:
+                continue
+            app_id = resolve_name_to_app_id_cached(title, app_list)
+            if app_id is not None:
+                p["steam_app_id"] = app_id
     return on_sale
 
 
+def _fetch_steam_data(app_id: int) -> tuple[dict | None, dict | None, dict]:
+    """Fetch (review summary, appdetails, SteamSpy appdetails) for one app_id. Runs in a worker thread."""
+    summary = fetch_app_reviews(app_id, use_cache=True)
+    details = fetch_app_details_full(app_id, use_cache=True)
+    steamspy = fetch_steamspy_appdetails(app_id, use_cache=True)
+    return summary, details, steamspy
+
+
+def _apply_steam_data(row: dict, summary: dict | None, details: dict | None, steamspy: dict) -> None:
+    """In-place: set steam_* and steamspy_* keys on row from fetched data."""
+    row["steam_release_date"] = details.get("release_date") if details else None
+    row["steam_developer"] = details.get("developer") if details else None
+    row["steam_publisher"] = details.get("publisher") if details else None
+    row["steam_tags"] = steamspy.get("tags") or []
+    row["steamspy_owners_estimate"] = steamspy.get("owners_estimate")
+    row["steamspy_ccu"] = steamspy.get("ccu")
+    if not summary:
+        row["steam_percent_positive"] = None
+        row["steam_review_desc"] = None
+        row["steam_total_reviews"] = None
+        return
+    total_reviews = summary.get("total_reviews") or 0
+    total_positive = summary.get("total_positive") or 0
+    if total_reviews > 0:
+        row["steam_percent_positive"] = round(100 * total_positive / total_reviews)
+    else:
+        row["steam_percent_positive"] = None
+    row["steam_review_desc"] = (summary.get("review_score_desc") or "").strip() or None
+    row["steam_total_reviews"] = total_reviews
+
+
+# Steam fields for rows without an app_id (steam_tags is set separately so rows don't share a list).
+_NO_STEAM_DATA = {
+    "steam_percent_positive": None,
+    "steam_review_desc": None,
+    "steam_total_reviews": None,
+    "steam_release_date": None,
+    "steam_developer": None,
+    "steam_publisher": None,
+    "steamspy_owners_estimate": None,
+    "steamspy_ccu": None,
+}
+
+# Sort key for rows without a review percentage (see _rating_sort_key).
+_NO_RATING_SORT_KEY = (-1, 0)
+
+
+def _rating_sort_key(row: dict) -> tuple[int, int]:
+    """Sort key for enriched rows: best rating first, then most reviews."""
+    pct = row["steam_percent_positive"]
+    if pct is None:
+        return _NO_RATING_SORT_KEY
+    return (-pct, -(row["steam_total_reviews"] or 0))
+
+
 def enrich_with_steam_reviews(
     products: list[dict],
     progress_callback=None,
@@ -186,60 +293,46 @@ def enrich_with_steam_reviews(
     For each product with steam_app_id, fetch review summary and attach:
     steam_percent_positive, steam_review_desc, steam_total_reviews.
     Products without data get None for those keys. Sorted by percent best first (N/A last).
-    progress_callback(current_index, total) called during fetch if provided.
+    Fetches run concurrently (STEAM_FETCH_MAX_WORKERS threads), once per unique app_id; the per-app fetchers cache to disk.
+    progress_callback(done, total) called as products complete if provided.
     """
     total = len(products)
     rows = []
-    for i, p in enumerate(products):
-        if progress_callback:
-            progress_callback(i, total)
-        row = dict(p)
+    # (sort key..., row index) kept sorted as rows are filled; the index keeps ties in product order
+    ordered: list[tuple[int, int, int]] = []
+    pending: dict[int, list[int]] = {}  # app_id -> row indices (products can share an app_id)
+    for p in products:
+        row = p.copy()
+        # Precompute once per fetch so sale-end sort/filter doesn't rescan variants on every apply
+        # (get_on_sale_products already sets it)
+        if "sale_end_ms" not in row:
+            row["sale_end_ms"] = _sale_end_ms(p)
         app_id = p.get("steam_app_id")
         if app_id is None:
-            row["steam_percent_positive"] = None
-            row["steam_review_desc"] = None
-            row["steam_total_reviews"] = None
-            row["steam_release_date"] = None
-            row["steam_developer"] = None
-            row["steam_publisher"] = None
+            row.update(_NO_STEAM_DATA)
             row["steam_tags"] = []
-            row["steamspy_owners_estimate"] = None
-            row["steamspy_ccu"] = None
-            rows.append(row)
-            continue
-        summary = fetch_app_reviews(app_id, use_cache=True)
-        details = fetch_app_details_full(app_id, use_cache=True)
-        release_date = details.get("release_date") if details else None
-        row["steam_release_date"] = release_date
-        row["steam_developer"] = details.get("developer") if details else None
-        row["steam_publisher"] = details.get("publisher") if details else None
-        steamspy = fetch_steamspy_appdetails(app_id, use_cache=True)
-        row["steam_tags"] = steamspy.get("tags") or []
-        row["steamspy_owners_estimate"] = steamspy.get("owners_estimate")
-        row["steamspy_ccu"] = steamspy.get("ccu")
-        if not summary:
-            row["steam_percent_positive"] = None
-            row["steam_review_desc"] = None
-            row["steam_total_reviews"] = None
-            rows.append(row)
-            continue
-        total_reviews = summary.get("total_reviews") or 0
-        total_positive = summary.get("total_positive") or 0
-        if total_reviews > 0:
-            row["steam_percent_positive"] = round(100 * total_positive / total_reviews)
+            ordered.append((*_NO_RATING_SORT_KEY, len(rows)))
         else:
-            row["steam_percent_positive"] = None
-        row["steam_review_desc"] = (summary.get("review_score_desc") or "").strip() or None
-        row["steam_total_reviews"] = total_reviews
+            pending.setdefault(app_id, []).append(len(rows))
         rows.append(row)
+    done = total - sum(len(indices) for indices in pending.values())
     if progress_callback:
-        progress_callback(total, total)
-    # Sort: best rating first, then by total_reviews desc; N/A at end
-    def sort_key(r):
-        pct = r.get("steam_percent_positive")
-        rev = r.get("steam_total_reviews") or 0
-        if pct is None:
-            return (-1, 0)
-        return (-pct, -rev)
-    rows.sort(key=sort_key)
-    return rows
+        progress_callback(done, total)
+    if pending:
+        with batch_appdetails_writes(), ThreadPoolExecutor(max_workers=STEAM_FETCH_MAX_WORKERS) as pool:
+            # One fetch per unique app_id; results are applied to every row that shares it
+            futures = {pool.submit(_fetch_steam_data, app_id): indices for app_id, indices in pending.items()}
+            for fut in as_completed(futures):
+                data = fut.result()
+                indices = futures[fut]
+                for i in indices:
+                    _apply_steam_data(rows[i], *data)
+                key = _rating_sort_key(rows[indices[0]])
+                for i in indices:
+                    insort(ordered, (*key, i))
+                done += len(indices)
+                if progress_callback:
+                    progress_callback(done, total)
+        flush_steamspy_cache()
+    # Sorted: best rating first, then by total_reviews desc; N/A at end
+    return [rows[i] for *_, i in ordered]
@@ -1,8 +1,8 @@
 """Index feed items by product URL and resolve pasted URLs to products."""
 
-import json
 import os
 
+import fast_json
 from feed_client import parse_feed
 from config import STEAM_MAPPING_PATH
 
@@ -22,29 +22,38 @@ def normalize_url(url: str) -> str:
     return u
 
 
+# (operatingSystems token, abbreviation) in display order
+_PLATFORM_MAP = (("WINDOWS", "W"), ("MAC", "M"), ("LINUX", "L"))
+
+
 def _platform_abbrev(systems: str) -> str:
     """Convert operatingSystems string to 'W, M, L' style."""
     if not systems:
         return ""
-    parts = []
     upper = systems.upper()
-    if "WINDOWS" in upper:
-        parts.append("W")
-    if "MAC" in upper:
-        parts.append("M")
-    if "LINUX" in upper:
-        parts.append("L")
-    return ", ".join(parts) if parts else ""
+    return ", ".join([abbrev for name, abbrev in _PLATFORM_MAP if name in upper])
+
+
+# Parsed mapping file, reused until the file's mtime changes.
+_mapping_cache: dict[str, int] | None = None
+_mapping_mtime: float | None = None
 
 
 def _load_steam_mapping() -> dict[str, int]:
-    """Load Steam App ID mapping: normalized product URL -> app_id."""
-    if not os.path.isfile(STEAM_MAPPING_PATH):
+    """Load Steam App ID mapping: normalized product URL -> app_id. Re-parsed only when the file changes."""
+    global _mapping_cache, _mapping_mtime
+    try:
+        mtime = os.stat(STEAM_MAPPING_PATH).st_mtime
+    except OSError:
+        _mapping_cache = None
+        _mapping_mtime = None
         return {}
+    if _mapping_cache is not None and mtime == _mapping_mtime:
+        return _mapping_cache
     try:
-        with open(STEAM_MAPPING_PATH, encoding="utf-8") as f:
-            data = json.load(f)
-    except (json.JSONDecodeError, OSError):
+        with open(STEAM_MAPPING_PATH, "rb") as f:
+            data = fast_json.load_file(f)
+    except (fast_json.JSONDecodeError, OSError):
         return {}
     out = {}
     for k, v in data.items():
@@ -55,6 +64,8 @@ def _load_steam_mapping() -> dict[str, int]:
         except (TypeError, ValueError):
             continue
         out[normalize_url(str(k))] = app_id
+    _mapping_cache = out
+    _mapping_mtime = mtime
     return out
 
 
@@ -68,29 +79,23 @@ def build_index(items: list[dict]) -> dict[str, dict]:
     steam_mapping = _load_steam_mapping()
     index = {}
     for it in items:
-        link = it.get("link", "").strip()
+        get = it.get
+        link = get("link", "").strip()
         if not link:
             continue
         key = normalize_url(link)
         if not key:
             continue
-        title = it.get("title", "").strip()
-        platform = _platform_abbrev(it.get("operatingSystems", ""))
-        currency = (it.get("currency") or "").strip().upper()
+        currency = (get("currency") or "").strip().upper()
         if not currency:
             continue
-        variant = {
-            "currency": currency,
-            "discountPrice": it.get("discountPrice"),
-            "discountPercentage": it.get("discountPercentage"),
-            "discountStartDate": it.get("discountStartDate"),
-            "discountEndDate": it.get("discountEndDate"),
-            "originalPrice": it.get("originalPrice"),
-        }
-        steam_app_id = it.get("steam_app_id")
-        cover_image = it.get("cover_image") or None
-        if key not in index:
-            index[key] = {
+        title = get("title", "").strip()
+        platform = _platform_abbrev(get("operatingSystems", ""))
+        steam_app_id = get("steam_app_id")
+        cover_image = get("cover_image") or None
+        rec = index.get(key)
+        if rec is None:
+            rec = index[key] = {
                 "title": title,
                 "link": link,
                 "platform": platform,
@@ -99,16 +104,24 @@ def build_index(items: list[dict]) -> dict[str, dict]:
                 "cover_image": cover_image,
             }
         # One variant per currency (first seen)
-        if currency not in index[key]["variants_by_currency"]:
-            index[key]["variants_by_currency"][currency] = variant
-        if platform and not index[key]["platform"]:
-            index[key]["platform"] = platform
-        if title and not index[key]["title"]:
-            index[key]["title"] = title
-        if steam_app_id is not None and index[key]["steam_app_id"] is None:
-            index[key]["steam_app_id"] = steam_app_id
-        if cover_image and not index[key].get("cover_image"):
-            index[key]["cover_image"] = cover_image
+        variants = rec["variants_by_currency"]
+        if currency not in variants:
+            variants[currency] = {
+                "currency": currency,
+                "discountPrice": get("discountPrice"),
+                "discountPercentage": get("discountPercentage"),
+                "discountStartDate": get("discountStartDate"),
+                "discountEndDate": get("discountEndDate"),
+                "originalPrice": get("originalPrice"),
+            }
+        if platform and not rec["platform"]:
+            rec["platform"] = platform
+        if title and not rec["title"]:
+            rec["title"] = title
+        if steam_app_id is not None and rec["steam_app_id"] is None:
+            rec["steam_app_id"] = steam_app_id
+        if cover_image and not rec.get("cover_image"):
+            rec["cover_image"] = cover_image
     # Apply mapping file (overrides or sets steam_app_id)
     for url_key, app_id in steam_mapping.items():
         if url_key in index:
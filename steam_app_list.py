@@ -2,12 +2,14 @@
 
 import json
 import os
-import re
 import time
+from contextlib import contextmanager
 from datetime import datetime, timedelta
+from functools import lru_cache
 
 import requests
 
+import fast_json
 from config import (
     STEAM_APP_LIST_CACHE_PATH,
     STEAM_APP_LIST_PAGE_SIZE,
@@ -17,23 +19,40 @@ from config import (
     STEAM_WEB_API_KEY,
 )
 
+# Optional: stream-parse the app list pages instead of loading each whole response body at once.
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+_APP_LIST_PARSE_ERRORS = (json.JSONDecodeError,) if ijson is None else (json.JSONDecodeError, ijson.JSONError)
+
+
+# In-memory copy of the app list cache (apps, fetched_at) so the large file is parsed once per process.
+_memory_app_list: tuple[list[dict], str | None] | None = None
+
 
 def _load_app_list_cache() -> tuple[list[dict], str | None]:
-    """Load app list from disk cache. Returns (list of {appid, name}, fetched_at or None)."""
+    """Load app list from disk cache (or return in-memory copy). Returns (list of {appid, name}, fetched_at or None)."""
+    global _memory_app_list
+    if _memory_app_list is not None:
+        return _memory_app_list
     if not os.path.isfile(STEAM_APP_LIST_CACHE_PATH):
         return [], None
     try:
-        with open(STEAM_APP_LIST_CACHE_PATH, encoding="utf-8") as f:
-            data = json.load(f)
+        with open(STEAM_APP_LIST_CACHE_PATH, "rb") as f:
+            data = fast_json.load_file(f)
         apps = data.get("apps", [])
         fetched_at = data.get("fetched_at")
-        return apps, fetched_at
-    except (json.JSONDecodeError, OSError):
+        _memory_app_list = (apps, fetched_at)
+        return _memory_app_list
+    except (fast_json.JSONDecodeError, OSError):
         return [], None
 
 
 def _save_app_list_cache(apps: list[dict]) -> None:
-    """Write app list to disk cache."""
+    """Write app list to disk cache and update in-memory copy."""
+    global _memory_app_list
     dirpath = os.path.dirname(STEAM_APP_LIST_CACHE_PATH)
     if dirpath and not os.path.isdir(dirpath):
         os.makedirs(dirpath, exist_ok=True)
@@ -41,8 +60,12 @@ def _save_app_list_cache(apps: list[dict]) -> None:
         "apps": apps,
         "fetched_at": datetime.utcnow().isoformat() + "Z",
     }
-    with open(STEAM_APP_LIST_CACHE_PATH, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=0)
+    # Write to a temp file and swap it in so a crash mid-write can't leave a truncated cache
+    tmp_path = STEAM_APP_LIST_CACHE_PATH + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(fast_json.dumps(data))
+    os.replace(tmp_path, STEAM_APP_LIST_CACHE_PATH)
+    _memory_app_list = (apps, data["fetched_at"])
 
 
 def _is_cache_expired(fetched_at: str | None) -> bool:
@@ -67,13 +90,34 @@ def _parse_app_list_response(body: dict) -> list[dict]:
         raw = body.get("apps", [])
     result = []
     for a in raw:
-        if not isinstance(a, dict):
-            continue
-        appid = a.get("appid") or a.get("steam_appid")
-        if appid is None:
-            continue
-        name = (a.get("name") or a.get("app_name") or a.get("title") or "").strip()
-        result.append({"appid": int(appid), "name": name})
+        entry = _app_entry(a)
+        if entry is not None:
+            result.append(entry)
+    return result
+
+
+def _app_entry(a) -> dict | None:
+    """Trim one raw app object to {appid, name}, or None if it has no app id."""
+    if not isinstance(a, dict):
+        return None
+    appid = a.get("appid") or a.get("steam_appid")
+    if appid is None:
+        return None
+    name = (a.get("name") or a.get("app_name") or a.get("title") or "").strip()
+    return {"appid": int(appid), "name": name}
+
+
+def _stream_app_list_page(resp) -> list[dict]:
+    """
+    Parse one streamed IStoreService/GetAppList page with ijson, keeping only {appid, name} per app.
+    Only reads response.apps; other shapes yield [] and are handled by _parse_app_list_response.
+    """
+    resp.raw.decode_content = True
+    result = []
+    for a in ijson.items(resp.raw, "response.apps.item"):
+        entry = _app_entry(a)
+        if entry is not None:
+            result.append(entry)
     return result
 
 
@@ -96,14 +140,22 @@ def get_app_list(force_refresh: bool = False) -> list[dict]:
             params = {"key": key, "max_results": STEAM_APP_LIST_PAGE_SIZE}
             if last_appid is not None:
                 params["last_appid"] = last_appid
-            resp = requests.get(
-                STEAM_APP_LIST_URL,
-                params=params,
-                timeout=120,
-            )
-            resp.raise_for_status()
-            body = resp.json()
-            batch = _parse_app_list_response(body)
+            batch = []
+            if ijson is not None:
+                with requests.get(STEAM_APP_LIST_URL, params=params, timeout=120, stream=True) as resp:
+                    resp.raise_for_status()
+                    batch = _stream_app_list_page(resp)
+            if not batch:
+                # No ijson, or the streamed page wasn't in the response.apps shape (or was empty):
+                # load the whole body and let _parse_app_list_response try every known shape
+                resp = requests.get(
+                    STEAM_APP_LIST_URL,
+                    params=params,
+                    timeout=120,
+                )
+                resp.raise_for_status()
+                body = fast_json.loads(resp.content)
+                batch = _parse_app_list_response(body)
             if not batch:
                 break
             all_apps.extend(batch)
@@ -114,44 +166,123 @@ def get_app_list(force_refresh: bool = False) -> list[dict]:
             _save_app_list_cache(all_apps)
             return all_apps
         return apps  # Keep existing cache on empty response
-    except (requests.RequestException, json.JSONDecodeError, KeyError, TypeError):
+    except (requests.RequestException, *_APP_LIST_PARSE_ERRORS, KeyError, TypeError):
         return apps  # Return existing cache on error
 
 
+# Cache file used before the switch to JSONL; deleted on first load.
+_LEGACY_RESOLUTION_CACHE_PATH = os.path.join(
+    os.path.dirname(STEAM_NAME_RESOLUTION_CACHE_PATH), "steam_name_resolution_cache.json"
+)
 # In-memory cache so we only read/parse the resolution cache once per process.
 _memory_resolution: dict[str, int] | None = None
+# Lines currently in the resolution JSONL file (including superseded ones); drives compaction.
+_resolution_lines = 0
+# Rewrite the JSONL file once it holds this many times more lines than live entries.
+_RESOLUTION_COMPACT_RATIO = 2
+# Nesting depth of batch_resolution_writes(); while > 0, new resolutions collect in _pending_resolutions.
+_resolution_batch_depth = 0
+_pending_resolutions: dict[str, int] = {}
 
 
 def _load_resolution_cache() -> dict[str, int]:
-    """Load name->appid resolution cache from disk (or return in-memory copy). Returns dict normalized_title -> app_id."""
-    global _memory_resolution
+    """
+    Load name->appid resolution cache from disk (or return in-memory copy). Returns dict normalized_title -> app_id.
+    The file is JSONL, one {"norm": ..., "appid": ...} per line; later lines win. Unreadable lines are skipped.
+    """
+    global _memory_resolution, _resolution_lines
     if _memory_resolution is not None:
         return _memory_resolution
-    if not os.path.isfile(STEAM_NAME_RESOLUTION_CACHE_PATH):
-        _memory_resolution = {}
-        return _memory_resolution
+    cache: dict[str, int] = {}
+    lines = 0
+    # The pre-JSONL cache file is never read; remove it once so it doesn't linger on disk
     try:
-        with open(STEAM_NAME_RESOLUTION_CACHE_PATH, encoding="utf-8") as f:
-            data = json.load(f)
-        if not isinstance(data, dict):
-            _memory_resolution = {}
-            return _memory_resolution
-        _memory_resolution = {k: int(v) for k, v in data.items() if v is not None and isinstance(v, (int, str)) and str(v).isdigit()}
-        return _memory_resolution
-    except (json.JSONDecodeError, OSError, ValueError):
-        _memory_resolution = {}
-        return _memory_resolution
+        os.remove(_LEGACY_RESOLUTION_CACHE_PATH)
+    except OSError:
+        pass
+    if os.path.isfile(STEAM_NAME_RESOLUTION_CACHE_PATH):
+        try:
+            with open(STEAM_NAME_RESOLUTION_CACHE_PATH, "rb") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    lines += 1
+                    try:
+                        rec = fast_json.loads(line)
+                        norm = rec["norm"]
+                        appid = int(rec["appid"])
+                    except (fast_json.JSONDecodeError, KeyError, TypeError, ValueError):
+                        continue
+                    if isinstance(norm, str) and norm:
+                        cache[norm] = appid
+        except OSError:
+            cache = {}
+            lines = 0
+    _memory_resolution = cache
+    _resolution_lines = lines
+    return _memory_resolution
 
 
-def _save_resolution_cache(cache: dict[str, int]) -> None:
-    """Write name->appid resolution cache to disk and update in-memory cache."""
-    global _memory_resolution
-    dirpath = os.path.dirname(STEAM_NAME_RESOLUTION_CACHE_PATH)
-    if dirpath and not os.path.isdir(dirpath):
-        os.makedirs(dirpath, exist_ok=True)
-    with open(STEAM_NAME_RESOLUTION_CACHE_PATH, "w", encoding="utf-8") as f:
-        json.dump(cache, f, indent=0)
-    _memory_resolution = cache
+def _append_resolution(norm: str, appid: int) -> None:
+    """Record one name->appid resolution: update in-memory cache and append a line to the JSONL file."""
+    cache = _load_resolution_cache()
+    cache[norm] = appid
+    if _resolution_batch_depth:
+        _pending_resolutions[norm] = appid
+        return
+    _write_resolutions({norm: appid})
+
+
+# Set once the cache directory is known to exist, so appends skip the stat/mkdir after the first.
+_resolution_dir_ok = False
+
+
+def _ensure_resolution_dir() -> None:
+    """Create the cache directory on first write; later calls are a flag check."""
+    global _resolution_dir_ok
+    if not _resolution_dir_ok:
+        dirpath = os.path.dirname(STEAM_NAME_RESOLUTION_CACHE_PATH)
+        if dirpath:
+            os.makedirs(dirpath, exist_ok=True)
+        _resolution_dir_ok = True
+
+
+def _write_resolutions(resolutions: dict[str, int]) -> None:
+    """Append resolution lines to the JSONL file in one open, then compact if needed."""
+    global _resolution_lines
+    _ensure_resolution_dir()
+    with open(STEAM_NAME_RESOLUTION_CACHE_PATH, "ab") as f:
+        f.writelines(fast_json.dumps({"norm": norm, "appid": appid}) + b"\n" for norm, appid in resolutions.items())
+    _resolution_lines += len(resolutions)
+    _compact_if_needed()
+
+
+@contextmanager
+def batch_resolution_writes():
+    """Defer resolution cache appends until the outermost batch exits, then write them in one go."""
+    global _resolution_batch_depth
+    _resolution_batch_depth += 1
+    try:
+        yield
+    finally:
+        _resolution_batch_depth -= 1
+        if not _resolution_batch_depth and _pending_resolutions:
+            resolutions = dict(_pending_resolutions)
+            _pending_resolutions.clear()
+            _write_resolutions(resolutions)
+
+
+def _compact_if_needed() -> None:
+    """Rewrite the resolution JSONL file with one line per entry once superseded lines pile up (atomically, via a temp file)."""
+    global _resolution_lines
+    cache = _load_resolution_cache()
+    if _resolution_lines <= _RESOLUTION_COMPACT_RATIO * len(cache):
+        return
+    tmp_path = STEAM_NAME_RESOLUTION_CACHE_PATH + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.writelines(fast_json.dumps({"norm": norm, "appid": appid}) + b"\n" for norm, appid in cache.items())
+    os.replace(tmp_path, STEAM_NAME_RESOLUTION_CACHE_PATH)
+    _resolution_lines = len(cache)
 
 
 # Substring matches require the shorter string to be at least this fraction of the longer (by length).
@@ -174,15 +305,115 @@ _EDITION_SUFFIXES = (
 _MIN_BASE_TITLE_LEN = 2
 
 
-def _normalize_title(title: str) -> str:
+# Dashes and colons fold to spaces before whitespace is collapsed.
+_DASH_TABLE = str.maketrans({"-": " ", ":": " ", "–": " ", "—": " "})
+
+
+def _normalize_name(title: str) -> str:
     """Normalize for matching: lowercase, collapse spaces, remove some punctuation."""
     if not title:
         return ""
-    s = title.strip().lower()
-    s = re.sub(r"\s+", " ", s)
-    s = re.sub(r"[-:–—]", " ", s)
-    s = re.sub(r"\s+", " ", s).strip()
-    return s
+    return " ".join(title.strip().lower().translate(_DASH_TABLE).split())
+
+
+# Product titles repeat across resolutions; app-list names are normalized once per index build via
+# _normalize_name and deliberately bypass this memo so they don't evict the titles.
+@lru_cache(maxsize=4096)
+def _normalize_title(title: str) -> str:
+    """_normalize_name, memoized for product titles."""
+    return _normalize_name(title)
+
+
+# Normalized-name index for the last app list seen; rebuilt only when a different app list
+# object (or a resized one) is passed in.
+_name_index_cache: tuple[list[dict], "_NameIndex"] | None = None
+
+
+class _NameIndex:
+    """Lookup structures over one app list for resolve_name_to_app_id."""
+
+    def __init__(self, app_list: list[dict]) -> None:
+        # normalized name -> list of (appid, original name)
+        by_norm: dict[str, list[tuple[int, str]]] = {}
+        for a in app_list:
+            name = (a.get("name") or "").strip()
+            appid = a.get("appid")
+            if name and appid is not None:
+                n = _normalize_name(name)
+                if n not in by_norm:
+                    by_norm[n] = []
+                by_norm[n].append((appid, name))
+        # Flat (normalized name, first appid) in by_norm order; positions give match priority
+        norm_entries = [(n, candidates[0][0]) for n, candidates in by_norm.items()]
+        positions: dict[str, int] = {}
+        # token -> ascending positions in norm_entries of names containing that whole token
+        token_index: dict[str, list[int]] = {}
+        for i, (n, _) in enumerate(norm_entries):
+            positions[n] = i
+            for t in set(n.split()):
+                postings = token_index.get(t)
+                if postings is None:
+                    token_index[t] = [i]
+                else:
+                    postings.append(i)
+        self.by_norm = by_norm
+        self.norm_entries = norm_entries
+        self.positions = positions
+        self.token_index = token_index
+
+
+def _get_name_index(app_list: list[dict]) -> _NameIndex:
+    """Return the _NameIndex for app_list, building it on first use."""
+    global _name_index_cache
+    cached = _name_index_cache
+    if cached is not None and cached[0] is app_list and len(cached[0]) == len(app_list):
+        return cached[1]
+    index = _NameIndex(app_list)
+    _name_index_cache = (app_list, index)
+    return index
+
+
+def _is_majority_substring(a: str, b: str) -> bool:
+    """True if one of a/b contains the other and the shorter is at least the majority of the longer."""
+    if a in b or b in a:
+        shorter = min(len(a), len(b))
+        longer = max(len(a), len(b))
+        return longer > 0 and (shorter / longer) >= _RESOLVE_SUBSTRING_MAJORITY
+    return False
+
+
+def _substring_match(norm_title: str, index: _NameIndex) -> int | None:
+    """
+    First app (in app list order) whose normalized name contains norm_title or is contained in it,
+    with majority length check. Uses the token index instead of scanning every name:
+    names containing the title are looked for in the posting list of the title's rarest token,
+    names contained in the title are looked up directly as contiguous token spans of the title.
+    Falls back to a full scan only when none of the title's tokens occur in any app name.
+    """
+    norm_entries = index.norm_entries
+    tokens = norm_title.split()
+    postings = [index.token_index[t] for t in tokens if t in index.token_index]
+    if not postings:
+        for n, appid in norm_entries:
+            if _is_majority_substring(norm_title, n):
+                return appid
+        return None
+    best: int | None = None
+    for i in min(postings, key=len):
+        if _is_majority_substring(norm_title, norm_entries[i][0]):
+            best = i
+            break
+    positions = index.positions
+    min_len = len(norm_title) * _RESOLVE_SUBSTRING_MAJORITY
+    for start in range(len(tokens)):
+        for stop in range(start + 1, len(tokens) + 1):
+            span = " ".join(tokens[start:stop])
+            if len(span) < min_len:
+                continue
+            i = positions.get(span)
+            if i is not None and (best is None or i < best):
+                best = i
+    return norm_entries[best][1] if best is not None else None
 
 
 def resolve_name_to_app_id(title: str, app_list: list[dict] | None = None) -> int | None:
@@ -201,31 +432,17 @@ def resolve_name_to_app_id(title: str, app_list: list[dict] | None = None) -> in
     norm_title = _normalize_title(title)
     if not norm_title:
         return None
-    # Build lookup: normalized name -> list of (appid, original name)
-    by_norm: dict[str, list[tuple[int, str]]] = {}
-    for a in app_list:
-        name = (a.get("name") or "").strip()
-        appid = a.get("appid")
-        if name and appid is not None:
-            n = _normalize_title(name)
-            if n not in by_norm:
-                by_norm[n] = []
-            by_norm[n].append((appid, name))
-    # 1) Exact match (normalized)
+    # Lookup: normalized name -> list of (appid, original name); built once per app list
+    index = _get_name_index(app_list)
+    by_norm = index.by_norm
+    # 1) Exact match (normalized; names are lowercased, so this is also the case-insensitive match)
     if norm_title in by_norm:
         return by_norm[norm_title][0][0]
-    # 2) Case-insensitive: norm_title equals some normalized name
-    for n, candidates in by_norm.items():
-        if n == norm_title:
-            return candidates[0][0]
-    # 3) Substring: product title contained in Steam name or vice versa, only if majority of titles match
-    for n, candidates in by_norm.items():
-        if norm_title in n or n in norm_title:
-            shorter = min(len(n), len(norm_title))
-            longer = max(len(n), len(norm_title))
-            if longer > 0 and (shorter / longer) >= _RESOLVE_SUBSTRING_MAJORITY:
-                return candidates[0][0]
-    # 4) Base-game fallback: strip edition suffixes and try again (for bundles without their own app)
+    # 2) Substring: product title contained in Steam name or vice versa, only if majority of titles match
+    app_id = _substring_match(norm_title, index)
+    if app_id is not None:
+        return app_id
+    # 3) Base-game fallback: strip edition suffixes and try again (for bundles without their own app)
     base_titles = set()
     for suffix in _EDITION_SUFFIXES:
         if norm_title.endswith(suffix):
@@ -235,12 +452,9 @@ def resolve_name_to_app_id(title: str, app_list: list[dict] | None = None) -> in
     for base in base_titles:
         if base in by_norm:
             return by_norm[base][0][0]
-        for n, candidates in by_norm.items():
-            if base in n or n in base:
-                shorter = min(len(n), len(base))
-                longer = max(len(n), len(base))
-                if longer > 0 and (shorter / longer) >= _RESOLVE_SUBSTRING_MAJORITY:
-                    return candidates[0][0]
+        app_id = _substring_match(base, index)
+        if app_id is not None:
+            return app_id
     return None
 
 
@@ -257,20 +471,23 @@ def resolve_name_to_app_id_cached(title: str, app_list: list[dict] | None = None
         return cache[norm]
     app_id = resolve_name_to_app_id(title, app_list)
     if app_id is not None:
-        cache[norm] = app_id
-        _save_resolution_cache(cache)
+        _append_resolution(norm, app_id)
     return app_id
 
 
 def clear_app_list_cache() -> None:
-    """Remove cached app list from disk."""
+    """Remove cached app list from disk and in-memory copy."""
+    global _memory_app_list
+    _memory_app_list = None
     if os.path.isfile(STEAM_APP_LIST_CACHE_PATH):
         os.remove(STEAM_APP_LIST_CACHE_PATH)
 
 
 def clear_name_resolution_cache() -> None:
     """Remove name->appid resolution cache from disk and in-memory cache."""
-    global _memory_resolution
+    global _memory_resolution, _resolution_lines
     _memory_resolution = None
+    _resolution_lines = 0
+    _pending_resolutions.clear()
     if os.path.isfile(STEAM_NAME_RESOLUTION_CACHE_PATH):
         os.remove(STEAM_NAME_RESOLUTION_CACHE_PATH)
@@ -1,155 +1,216 @@
 """Disk cache for Steam appdetails (e.g. release_date) per app_id with TTL."""
 
-import json
+import atexit
 import os
-from datetime import datetime, timedelta
+import threading
+import time
+from contextlib import contextmanager
 
-from config import STEAM_APPDETAILS_CACHE_PATH, STEAM_APPDETAILS_CACHE_TTL_HOURS
+import fast_json
+from config import (
+    STEAM_APPDETAILS_CACHE_PATH,
+    STEAM_APPDETAILS_CACHE_TTL_HOURS,
+    STEAM_APPDETAILS_NEGATIVE_TTL_HOURS,
+)
 
+# Cache file used before the switch to JSONL; deleted on first load.
+_LEGACY_CACHE_PATH = os.path.join(os.path.dirname(STEAM_APPDETAILS_CACHE_PATH), "steam_appdetails.json")
 # In-memory cache so we only read/parse the file once per process.
 _memory: dict | None = None
+# Lines currently in the JSONL file (including superseded ones); drives compaction.
+_line_count = 0
+# Rewrite the file once it holds this many times more lines than live entries.
+_COMPACT_RATIO = 2
+# Guards _memory and the cache file; enrich_with_steam_reviews fetches from several threads.
+_lock = threading.RLock()
+# Write-behind: new entries collect in _pending and are appended once enough pile up or enough time passes.
+_pending: dict[str, dict] = {}
+_DIRTY_THRESHOLD = 16
+_FLUSH_INTERVAL_S = 5.0
+_last_flush = time.monotonic()
+# Nesting depth of batch_writes(); while > 0, _pending is only flushed when the outermost batch exits.
+_batch_depth = 0
 
 
 def _load_all() -> dict:
-    """Load full cache from disk (or return in-memory copy). Returns dict app_id_str -> {release_date?, ...}."""
-    global _memory
+    """
+    Load full cache from disk (or return in-memory copy). Returns dict app_id_str -> {release_date?, ...}.
+    The file is JSONL, one {"app_id": ..., "entry": {...}} per line; later lines win.
+    """
+    global _memory, _line_count
     if _memory is not None:
         return _memory
-    if not os.path.isfile(STEAM_APPDETAILS_CACHE_PATH):
-        _memory = {}
-        return _memory
-    try:
-        with open(STEAM_APPDETAILS_CACHE_PATH, encoding="utf-8") as f:
-            _memory = json.load(f)
-        return _memory
-    except (json.JSONDecodeError, OSError):
-        _memory = {}
+    with _lock:
+        if _memory is not None:
+            return _memory
+        data: dict = {}
+        lines = 0
+        # The pre-JSONL cache file is never read; remove it once so it doesn't linger on disk
+        try:
+            os.remove(_LEGACY_CACHE_PATH)
+        except OSError:
+            pass
+        if os.path.isfile(STEAM_APPDETAILS_CACHE_PATH):
+            try:
+                with open(STEAM_APPDETAILS_CACHE_PATH, "rb") as f:
+                    for line in f:
+                        if not line.strip():
+                            continue
+                        lines += 1
+                        try:
+                            rec = fast_json.loads(line)
+                            data[str(rec["app_id"])] = dict(rec["entry"])
+                        except (fast_json.JSONDecodeError, KeyError, TypeError, ValueError):
+                            continue
+            except OSError:
+                data = {}
+                lines = 0
+        # Drop entries nobody will read again so _memory (and the next compaction) stays bounded by apps in use:
+        # expired negatives, and full entries expired for longer than _STALE_KEEP_SECONDS (newer ones serve ETag revalidation).
+        now = time.time()
+        for key, entry in list(data.items()):
+            negative = entry.get("negative", False)
+            entry["_exp"] = _expiry(entry.get("fetched_at"), negative)
+            if entry["_exp"] < (now if negative else now - _STALE_KEEP_SECONDS):
+                del data[key]
+        _line_count = lines
+        _memory = data
         return _memory
 
 
-def _save_all(data: dict) -> None:
-    """Write full cache to disk."""
-    dirpath = os.path.dirname(STEAM_APPDETAILS_CACHE_PATH)
-    if dirpath and not os.path.isdir(dirpath):
-        os.makedirs(dirpath, exist_ok=True)
-    with open(STEAM_APPDETAILS_CACHE_PATH, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=0)
+def _append_entry(key: str, entry: dict) -> None:
+    """Queue one entry for the cache file; flushed by threshold/interval, batch exit, flush() or at exit. Call with _lock held."""
+    _pending[key] = entry
+    if not _batch_depth and (
+        len(_pending) >= _DIRTY_THRESHOLD or time.monotonic() - _last_flush >= _FLUSH_INTERVAL_S
+    ):
+        _flush_pending()
+
+
+def _flush_pending() -> None:
+    """Append all queued entries to the cache file. Call with _lock held."""
+    global _last_flush
+    _last_flush = time.monotonic()
+    if not _pending:
+        return
+    entries = dict(_pending)
+    _pending.clear()
+    _write_entries(entries)
+
+
+def flush() -> None:
+    """Write any queued entries to disk now. Registered to run at exit."""
+    with _lock:
+        _flush_pending()
+
+
+atexit.register(flush)
+
+
+# Set once the cache directory is known to exist, so appends skip the stat/mkdir after the first.
+_cache_dir_ok = False
+
+
+def _ensure_cache_dir() -> None:
+    """Create the cache directory on first write; later calls are a flag check."""
+    global _cache_dir_ok
+    if not _cache_dir_ok:
+        dirpath = os.path.dirname(STEAM_APPDETAILS_CACHE_PATH)
+        if dirpath:
+            os.makedirs(dirpath, exist_ok=True)
+        _cache_dir_ok = True
+
+
+def _write_entries(entries: dict[str, dict]) -> None:
+    """Append entry lines to the cache file in one open, compacting when superseded lines pile up. Call with _lock held."""
+    global _line_count
+    _ensure_cache_dir()
+    with open(STEAM_APPDETAILS_CACHE_PATH, "ab") as f:
+        f.writelines(fast_json.dumps({"app_id": key, "entry": _disk_entry(entry)}) + b"\n" for key, entry in entries.items())
+    _line_count += len(entries)
+    _compact_if_needed()
 
 
-def _is_expired(fetched_at: str) -> bool:
-    """Return True if fetched_at is older than TTL."""
+@contextmanager
+def batch_writes():
+    """
+    Hold queued set_full writes until the outermost batch exits, then write them in one go.
+    Reads see new entries immediately (they are in memory); only the file append is postponed.
+    """
+    global _batch_depth
+    with _lock:
+        _batch_depth += 1
     try:
-        dt = datetime.fromisoformat(fetched_at.replace("Z", ""))
-    except (ValueError, TypeError):
-        return True
-    now = datetime.utcnow()
-    return (now - dt) > timedelta(hours=STEAM_APPDETAILS_CACHE_TTL_HOURS)
+        yield
+    finally:
+        with _lock:
+            _batch_depth -= 1
+            if not _batch_depth:
+                _flush_pending()
 
 
-def has_entry(app_id: int | str) -> bool:
-    """Return True if app_id has a valid (non-expired) cache entry."""
+def _compact_if_needed() -> None:
+    """Rewrite the cache file (atomically, via a temp file) with one line per entry if it has grown past _COMPACT_RATIO x entries. Call with _lock held."""
+    global _line_count
     data = _load_all()
-    key = str(app_id)
-    if key not in data:
-        return False
-    return not _is_expired(data[key].get("fetched_at", ""))
+    if _line_count <= _COMPACT_RATIO * len(data):
+        return
+    tmp_path = STEAM_APPDETAILS_CACHE_PATH + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.writelines(fast_json.dumps({"app_id": key, "entry": _disk_entry(entry)}) + b"\n" for key, entry in data.items())
+    os.replace(tmp_path, STEAM_APPDETAILS_CACHE_PATH)
+    _line_count = len(data)
 
 
-def get(app_id: int | str) -> str | None:
-    """Return cached release_date string for app_id, or None if missing/expired."""
-    data = _load_all()
-    key = str(app_id)
-    if key not in data:
-        return None
-    entry = data[key]
-    if _is_expired(entry.get("fetched_at", "")):
-        return None
-    return entry.get("release_date")
+# Entries carry a precomputed "_exp" (Unix expiry time) in memory; it is not written to disk.
+_TTL_SECONDS = STEAM_APPDETAILS_CACHE_TTL_HOURS * 3600
+# Entries with "negative": True record that the store had no data for the app; they expire sooner.
+_NEGATIVE_TTL_SECONDS = STEAM_APPDETAILS_NEGATIVE_TTL_HOURS * 3600
+# Expired full entries are kept this long for If-None-Match revalidation, then dropped on the next load.
+_STALE_KEEP_SECONDS = _TTL_SECONDS
 
 
-def get_screenshots(app_id: int | str, max_count: int = 4) -> list[str]:
-    """Return cached screenshot path_full URLs for app_id (up to max_count). Empty if missing/expired."""
-    data = _load_all()
-    key = str(app_id)
-    if key not in data:
-        return []
-    entry = data[key]
-    if _is_expired(entry.get("fetched_at", "")):
-        return []
-    urls = entry.get("screenshots") or []
-    return list(urls)[:max_count]
-
-
-def get_short_description(app_id: int | str) -> str | None:
-    """Return cached short_description for app_id, or None if missing/expired."""
-    data = _load_all()
-    key = str(app_id)
-    if key not in data:
-        return None
-    entry = data[key]
-    if _is_expired(entry.get("fetched_at", "")):
-        return None
-    return entry.get("short_description")
+def _expiry(fetched_at: float, negative: bool = False) -> float:
+    """Unix time at which an entry fetched at fetched_at (epoch seconds) expires; -inf if missing or not a number."""
+    if isinstance(fetched_at, (int, float)):
+        return fetched_at + (_NEGATIVE_TTL_SECONDS if negative else _TTL_SECONDS)
+    return float("-inf")
 
 
-def get_capsule_url(app_id: int | str, size: str) -> str | None:
-    """Return cached capsule/header URL for app_id and size (header, capsule_sm, capsule_md, capsule_616x353), or None if missing/expired."""
-    data = _load_all()
-    key = str(app_id)
-    if key not in data:
-        return None
-    entry = data[key]
-    if _is_expired(entry.get("fetched_at", "")):
-        return None
-    urls = entry.get("capsule_urls") or {}
-    return urls.get(size)
+def _disk_entry(entry: dict) -> dict:
+    """Entry as stored on disk: without in-memory "_" keys."""
+    return {k: v for k, v in entry.items() if not k.startswith("_")}
 
 
-def get_developer(app_id: int | str) -> str | None:
-    """Return cached developer string for app_id, or None if missing/expired."""
-    data = _load_all()
-    key = str(app_id)
-    if key not in data:
-        return None
-    entry = data[key]
-    if _is_expired(entry.get("fetched_at", "")):
-        return None
-    return entry.get("developer")
+def _ensure_loaded() -> dict:
+    """Return the in-memory cache, loading it from disk on first use."""
+    data = _memory
+    return data if data is not None else _load_all()
 
 
-def get_publisher(app_id: int | str) -> str | None:
-    """Return cached publisher string for app_id, or None if missing/expired."""
-    data = _load_all()
-    key = str(app_id)
-    if key not in data:
+def get_entry(app_id: int | str) -> dict | None:
+    """
+    Whole cached entry for app_id (release_date, screenshots, short_description, capsule_urls,
+    developer, publisher, ...), or None if missing/expired. Shared with the cache: do not mutate.
+    """
+    entry = _ensure_loaded().get(str(app_id))
+    if entry is None or entry["_exp"] < time.time():
         return None
-    entry = data[key]
-    if _is_expired(entry.get("fetched_at", "")):
-        return None
-    return entry.get("publisher")
+    return entry
 
 
-def set(app_id: int | str, release_date: str | None) -> None:
-    """Store release_date for app_id with current timestamp (merge; keeps existing screenshots, developer, publisher)."""
-    global _memory
-    data = _load_all()
-    key = str(app_id)
-    now = datetime.utcnow().isoformat() + "Z"
-    if key in data and not _is_expired(data[key].get("fetched_at", "")):
-        data[key]["release_date"] = release_date
-        data[key]["fetched_at"] = now
-    else:
-        existing = data.get(key) or {}
-        data[key] = {
-            "release_date": release_date,
-            "screenshots": existing.get("screenshots") or [],
-            "short_description": existing.get("short_description"),
-            "developer": existing.get("developer"),
-            "publisher": existing.get("publisher"),
-            "fetched_at": now,
-        }
-    _save_all(data)
-    _memory = data
+def get_stale_entry(app_id: int | str) -> dict | None:
+    """Cached entry for app_id even if expired (for conditional refetch), or None if missing. Do not mutate."""
+    return _ensure_loaded().get(str(app_id))
+
+
+def get_capsule_url(app_id: int | str, size: str) -> str | None:
+    """Return cached capsule/header URL for app_id and size (header, capsule_sm, capsule_md, capsule_616x353), or None if missing/expired."""
+    entry = get_entry(app_id)
+    if entry is None:
+        return None
+    urls = entry.get("capsule_urls") or {}
+    return urls.get(size)
 
 
 def set_full(
@@ -160,26 +221,72 @@ def set_full(
     capsule_urls: dict | None = None,
     developer: str | None = None,
     publisher: str | None = None,
+    etag: str | None = None,
 ) -> None:
-    """Store full appdetails entry: release_date, screenshots, short_description, capsule_urls, developer, publisher."""
-    global _memory
-    data = _load_all()
-    data[str(app_id)] = {
-        "release_date": release_date,
-        "screenshots": list(screenshots),
-        "short_description": short_description,
-        "capsule_urls": dict(capsule_urls) if capsule_urls else {},
-        "developer": developer,
-        "publisher": publisher,
-        "fetched_at": datetime.utcnow().isoformat() + "Z",
-    }
-    _save_all(data)
-    _memory = data
+    """
+    Store full appdetails entry: release_date, screenshots, short_description, capsule_urls, developer, publisher.
+    etag is the response ETag, kept so an expired entry can be revalidated with If-None-Match.
+    """
+    now = time.time()
+    with _lock:
+        data = _load_all()
+        key = str(app_id)
+        data[key] = {
+            "release_date": release_date,
+            "screenshots": list(screenshots),
+            "short_description": short_description,
+            "capsule_urls": dict(capsule_urls) if capsule_urls else {},
+            "developer": developer,
+            "publisher": publisher,
+            "etag": etag,
+            "fetched_at": now,
+            "_exp": now + _TTL_SECONDS,
+        }
+        _append_entry(key, data[key])
+
+
+def touch(app_id: int | str) -> None:
+    """Restart the TTL of an existing entry (the store confirmed it unchanged with 304 Not Modified)."""
+    now = time.time()
+    with _lock:
+        data = _load_all()
+        key = str(app_id)
+        entry = data.get(key)
+        if entry is None:
+            return
+        entry = dict(entry)
+        entry["fetched_at"] = now
+        entry["_exp"] = _expiry(now, entry.get("negative", False))
+        data[key] = entry
+        _append_entry(key, entry)
+
+
+def set_negative(app_id: int | str) -> None:
+    """Record that the store has no appdetails for app_id (success: false); kept for the shorter negative TTL."""
+    now = time.time()
+    with _lock:
+        data = _load_all()
+        key = str(app_id)
+        data[key] = {
+            "release_date": None,
+            "screenshots": [],
+            "short_description": None,
+            "capsule_urls": {},
+            "developer": None,
+            "publisher": None,
+            "negative": True,
+            "fetched_at": now,
+            "_exp": now + _NEGATIVE_TTL_SECONDS,
+        }
+        _append_entry(key, data[key])
 
 
 def clear() -> None:
     """Remove cache file from disk and in-memory cache."""
-    global _memory
-    _memory = None
-    if os.path.isfile(STEAM_APPDETAILS_CACHE_PATH):
-        os.remove(STEAM_APPDETAILS_CACHE_PATH)
+    global _memory, _line_count
+    with _lock:
+        _memory = None
+        _line_count = 0
+        _pending.clear()
+        if os.path.isfile(STEAM_APPDETAILS_CACHE_PATH):
+            os.remove(STEAM_APPDETAILS_CACHE_PATH)
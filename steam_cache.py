@@ -1,81 +1,165 @@
 """Disk cache for Steam review data (query_summary per app_id) with TTL."""
 
-import json
+import atexit
 import os
-from datetime import datetime, timedelta
+import threading
+import time
 
+import fast_json
 from config import STEAM_CACHE_PATH, STEAM_CACHE_TTL_HOURS
 
+# Cache file used before the switch to JSONL; deleted on first load.
+_LEGACY_CACHE_PATH = os.path.join(os.path.dirname(STEAM_CACHE_PATH), "steam_reviews.json")
 # In-memory cache so we only read/parse the file once per process.
 _memory: dict | None = None
+# Lines currently in the JSONL file (including superseded ones); drives compaction.
+_line_count = 0
+# Guards _memory and the cache file; enrich_with_steam_reviews fetches from several threads.
+_lock = threading.RLock()
 
 
 def _load_all() -> dict:
-    """Load full cache from disk (or return in-memory copy). Returns dict app_id_str -> {query_summary, fetched_at}."""
-    global _memory
+    """
+    Load full cache from disk (or return in-memory copy). Returns dict app_id_str -> {query_summary, fetched_at}.
+    The file is JSONL, one {"app_id": ..., "entry": {...}} per line; later lines win.
+    """
+    global _memory, _line_count
     if _memory is not None:
         return _memory
-    if not os.path.isfile(STEAM_CACHE_PATH):
-        _memory = {}
-        return _memory
-    try:
-        with open(STEAM_CACHE_PATH, encoding="utf-8") as f:
-            _memory = json.load(f)
-        return _memory
-    except (json.JSONDecodeError, OSError):
-        _memory = {}
+    with _lock:
+        if _memory is not None:
+            return _memory
+        data: dict = {}
+        lines = 0
+        # The pre-JSONL cache file is never read; remove it once so it doesn't linger on disk
+        try:
+            os.remove(_LEGACY_CACHE_PATH)
+        except OSError:
+            pass
+        if os.path.isfile(STEAM_CACHE_PATH):
+            try:
+                with open(STEAM_CACHE_PATH, "rb") as f:
+                    for line in f:
+                        if not line.strip():
+                            continue
+                        lines += 1
+                        try:
+                            rec = fast_json.loads(line)
+                            data[str(rec["app_id"])] = dict(rec["entry"])
+                        except (fast_json.JSONDecodeError, KeyError, TypeError, ValueError):
+                            continue
+            except OSError:
+                data = {}
+                lines = 0
+        # Expired entries are never served, so leave them out of _memory (and the next compaction)
+        now = time.time()
+        for key, entry in list(data.items()):
+            entry["_exp"] = _expiry(entry.get("fetched_at"))
+            if entry["_exp"] < now:
+                del data[key]
+        _line_count = lines
+        _memory = data
         return _memory
 
 
-def _save_all(data: dict) -> None:
-    """Write full cache to disk."""
-    dirpath = os.path.dirname(STEAM_CACHE_PATH)
-    if dirpath and not os.path.isdir(dirpath):
-        os.makedirs(dirpath, exist_ok=True)
-    with open(STEAM_CACHE_PATH, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=0)
+# Set once the cache directory is known to exist, so appends skip the stat/mkdir after the first.
+_cache_dir_ok = False
+
+
+def _ensure_cache_dir() -> None:
+    """Create the cache directory on first write; later calls are a flag check."""
+    global _cache_dir_ok
+    if not _cache_dir_ok:
+        dirpath = os.path.dirname(STEAM_CACHE_PATH)
+        if dirpath:
+            os.makedirs(dirpath, exist_ok=True)
+        _cache_dir_ok = True
+
+
+def _append(key: str, entry: dict) -> None:
+    """Append one entry line to the cache file; compact once superseded lines outnumber live entries. Call with _lock held."""
+    global _line_count
+    _ensure_cache_dir()
+    with open(STEAM_CACHE_PATH, "ab") as f:
+        f.write(fast_json.dumps({"app_id": key, "entry": _disk_entry(entry)}) + b"\n")
+    _line_count += 1
+    if _line_count > 2 * len(_load_all()):
+        _compact()
+
+
+def _compact() -> None:
+    """Rewrite the cache file with one line per live entry (via a temp file + os.replace). Call with _lock held."""
+    global _line_count
+    data = _load_all()
+    tmp_path = STEAM_CACHE_PATH + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.writelines(fast_json.dumps({"app_id": key, "entry": _disk_entry(entry)}) + b"\n" for key, entry in data.items())
+    os.replace(tmp_path, STEAM_CACHE_PATH)
+    _line_count = len(data)
+
+
+def flush() -> None:
+    """Compact the cache file if it holds superseded lines. Registered to run at exit."""
+    with _lock:
+        if _memory is None or _line_count <= len(_memory):
+            return
+        try:
+            _compact()
+        except OSError:
+            pass
+
+
+atexit.register(flush)
+
+
+# Entries carry a precomputed "_exp" (Unix expiry time) in memory; it is not written to disk.
+_TTL_SECONDS = STEAM_CACHE_TTL_HOURS * 3600
 
 
-def _is_expired(fetched_at: str) -> bool:
-    """Return True if fetched_at is older than TTL. Stored times are UTC (naive)."""
-    try:
-        dt = datetime.fromisoformat(fetched_at.replace("Z", ""))
-    except (ValueError, TypeError):
-        return True
-    now = datetime.utcnow()
-    return (now - dt) > timedelta(hours=STEAM_CACHE_TTL_HOURS)
+def _expiry(fetched_at: float) -> float:
+    """Unix time at which an entry fetched at fetched_at (epoch seconds) expires; -inf if missing or not a number."""
+    if isinstance(fetched_at, (int, float)):
+        return fetched_at + _TTL_SECONDS
+    return float("-inf")
+
+
+def _disk_entry(entry: dict) -> dict:
+    """Entry as stored on disk: without in-memory "_" keys."""
+    return {k: v for k, v in entry.items() if not k.startswith("_")}
 
 
 def get(app_id: int | str) -> dict | None:
     """
     Return cached query_summary for app_id, or None if missing/expired.
     """
-    data = _load_all()
-    key = str(app_id)
-    if key not in data:
-        return None
-    entry = data[key]
-    fetched_at = entry.get("fetched_at", "")
-    if _is_expired(fetched_at):
+    data = _memory
+    if data is None:
+        data = _load_all()
+    entry = data.get(str(app_id))
+    if entry is None or entry["_exp"] < time.time():
         return None
     return entry.get("query_summary")
 
 
 def set(app_id: int | str, query_summary: dict) -> None:
     """Store query_summary for app_id with current timestamp."""
-    global _memory
-    data = _load_all()
-    data[str(app_id)] = {
-        "query_summary": query_summary,
-        "fetched_at": datetime.utcnow().isoformat() + "Z",
-    }
-    _save_all(data)
-    _memory = data
+    now = time.time()
+    with _lock:
+        data = _load_all()
+        key = str(app_id)
+        data[key] = {
+            "query_summary": query_summary,
+            "fetched_at": now,
+            "_exp": now + _TTL_SECONDS,
+        }
+        _append(key, data[key])
 
 
 def clear() -> None:
     """Remove all cached entries from disk and in-memory cache."""
-    global _memory
-    _memory = None
-    if os.path.isfile(STEAM_CACHE_PATH):
-        os.remove(STEAM_CACHE_PATH)
+    global _memory, _line_count
+    with _lock:
+        _memory = None
+        _line_count = 0
+        if os.path.isfile(STEAM_CACHE_PATH):
+            os.remove(STEAM_CACHE_PATH)
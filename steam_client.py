@@ -1,32 +1,62 @@
 """Fetch Steam app review summary and appdetails from store.steampowered.com (no API key)."""
 
+import threading
 import time
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
+import fast_json
 from config import STEAM_APPREVIEWS_URL_TEMPLATE, STEAM_APPDETAILS_URL_TEMPLATE
 from steam_cache import get as cache_get, set as cache_set
 from steam_appdetails_cache import (
-    get as appdetails_cache_get,
-    get_developer as appdetails_cache_get_developer,
-    get_publisher as appdetails_cache_get_publisher,
-    get_screenshots as appdetails_cache_get_screenshots,
-    get_short_description as appdetails_cache_get_short_description,
-    has_entry as appdetails_cache_has_entry,
-    set as appdetails_cache_set,
+    get_entry as appdetails_cache_get_entry,
+    get_stale_entry as appdetails_cache_get_stale_entry,
+    set_negative as appdetails_cache_set_negative,
+    touch as appdetails_cache_touch,
     set_full as appdetails_cache_set_full,
 )
 from steam_images import STEAM_CDN_BASE, STEAM_IMAGE_PATHS
 
-# Delay in seconds between requests when fetching many (be respectful to store)
+# Minimum spacing between store requests, shared by all threads (be respectful to store; ~2.5 req/s)
 REQUEST_DELAY_SECONDS = 0.4
 
+# Shared keep-alive session so repeated store requests reuse connections instead of a TLS handshake each.
+# Sized for the enrichment thread pool; transient 429/5xx responses are retried with backoff.
+_SESSION = requests.Session()
+_SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=16,
+        max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504]),
+    ),
+)
+
+
+# Monotonic time at which the next store request may start. Both fetchers take a slot before sending,
+# so concurrent enrichment workers together stay at one request per REQUEST_DELAY_SECONDS.
+_next_allowed = 0.0
+_rate_lock = threading.Lock()
+
+
+def _wait_for_request_slot() -> None:
+    """Block until this thread may send a store request (spaced REQUEST_DELAY_SECONDS apart across threads)."""
+    global _next_allowed
+    with _rate_lock:
+        now = time.monotonic()
+        slot = max(now, _next_allowed)
+        _next_allowed = slot + REQUEST_DELAY_SECONDS
+    if slot > now:
+        time.sleep(slot - now)
+
 
 def fetch_app_reviews(app_id: int | str, use_cache: bool = True) -> dict | None:
     """
     Fetch review query_summary for the given Steam app_id.
     Returns query_summary dict (review_score_desc, total_positive, total_reviews, etc.) or None.
-    Uses steam_cache when use_cache is True; adds a short delay after the request.
+    Uses steam_cache when use_cache is True; network requests are rate-limited across threads.
     """
     app_id = int(app_id)
     if use_cache:
@@ -34,93 +64,102 @@ def fetch_app_reviews(app_id: int | str, use_cache: bool = True) -> dict | None:
         if cached is not None:
             return cached
     url = STEAM_APPREVIEWS_URL_TEMPLATE.format(app_id=app_id)
+    _wait_for_request_slot()
     try:
-        resp = requests.get(url, timeout=15)
+        resp = _SESSION.get(url, timeout=15)
         resp.raise_for_status()
-        data = resp.json()
+        data = fast_json.loads(resp.content)
         if not data.get("success") or "query_summary" not in data:
             return None
         summary = data["query_summary"]
         if use_cache:
             cache_set(app_id, summary)
-        time.sleep(REQUEST_DELAY_SECONDS)
         return summary
-    except (requests.RequestException, KeyError, TypeError):
+    except (requests.RequestException, fast_json.JSONDecodeError, KeyError, TypeError):
         return None
 
 
-def fetch_app_details(app_id: int | str, use_cache: bool = True) -> str | None:
-    """
-    Fetch appdetails for the given Steam app_id and return release_date string (e.g. "Aug 21, 2012").
-    Returns None if missing, coming_soon, or on error. Uses appdetails cache when use_cache is True.
-    """
-    app_id = int(app_id)
-    if use_cache:
-        cached = appdetails_cache_get(app_id)
-        if cached is not None:
-            return cached
-    url = STEAM_APPDETAILS_URL_TEMPLATE.format(app_id=app_id)
-    try:
-        resp = requests.get(url, timeout=15)
-        resp.raise_for_status()
-        data = resp.json()
-        key = str(app_id)
-        if key not in data or not data[key].get("success"):
-            appdetails_cache_set(app_id, None)
-            time.sleep(REQUEST_DELAY_SECONDS)
-            return None
-        inner = data[key].get("data") or {}
-        release = inner.get("release_date") or {}
-        if release.get("coming_soon"):
-            date_str = None
-        else:
-            date_str = (release.get("date") or "").strip() or None
-        if use_cache:
-            appdetails_cache_set(app_id, date_str)
-        time.sleep(REQUEST_DELAY_SECONDS)
-        return date_str
-    except (requests.RequestException, KeyError, TypeError):
-        return None
+# Full CDN URL template per capsule/header size; only app_id is substituted per call.
+_CAPSULE_TEMPLATES = {
+    size: STEAM_CDN_BASE + (path if path.startswith("/") else "/" + path)
+    for size, path in STEAM_IMAGE_PATHS.items()
+}
 
 
 def _build_capsule_urls(app_id: int) -> dict[str, str]:
     """Build capsule/header CDN URLs for all sizes (same as steam_images)."""
-    urls = {}
-    for size, path_tpl in STEAM_IMAGE_PATHS.items():
-        rel = path_tpl.format(app_id=app_id)
-        url = STEAM_CDN_BASE + ("/" + rel if not rel.startswith("/") else rel)
-        urls[size] = url
-    return urls
+    return {size: tpl.format(app_id=app_id) for size, tpl in _CAPSULE_TEMPLATES.items()}
+
+
+def _normalize_str_list(raw) -> str | None:
+    """Join a developers/publishers list (or dict of them) as "A, B", skipping blanks; None if empty."""
+    if not raw:
+        return None
+    if isinstance(raw, dict):
+        raw = raw.values()
+    return ", ".join([s for s in (str(x).strip() for x in raw if x) if s]) or None
+
+
+def _has_developer_or_publisher(entry: dict) -> bool:
+    """True if a cached appdetails entry is complete (pre-backfill entries lack developer/publisher)."""
+    return entry.get("developer") is not None or entry.get("publisher") is not None
+
+
+def _details_from_entry(entry: dict) -> dict:
+    """fetch_app_details_full result built from a cached appdetails entry."""
+    return {
+        "release_date": entry.get("release_date"),
+        "screenshots": (entry.get("screenshots") or [])[:4],
+        "short_description": entry.get("short_description"),
+        "developer": entry.get("developer"),
+        "publisher": entry.get("publisher"),
+    }
 
 
 def fetch_app_details_full(app_id: int | str, use_cache: bool = True) -> dict | None:
     """
     Fetch appdetails and return { "release_date", "screenshots", "short_description", "developer", "publisher" }.
-    Caches result. Uses cache whenever we have a valid entry. Refetches if cache has no developer/publisher (backfill).
-    Saves capsule_urls, developer, publisher to cache.
+    When use_cache is True, reads and writes the appdetails cache (success and "no data" results alike):
+    uses it whenever we have a valid entry, refetches if it has no developer/publisher (backfill),
+    and saves capsule_urls, developer, publisher to it.
     """
     app_id = int(app_id)
-    if use_cache and appdetails_cache_has_entry(app_id):
-        cached = {
-            "release_date": appdetails_cache_get(app_id),
-            "screenshots": appdetails_cache_get_screenshots(app_id, max_count=4),
-            "short_description": appdetails_cache_get_short_description(app_id),
-            "developer": appdetails_cache_get_developer(app_id),
-            "publisher": appdetails_cache_get_publisher(app_id),
-        }
+    entry = appdetails_cache_get_entry(app_id) if use_cache else None
+    if entry is not None:
+        # Store had no data for this app last time; don't ask again until the negative entry expires
+        if entry.get("negative"):
+            return None
         # Backfill: old cache entries lack developer/publisher; refetch to populate
-        if cached.get("developer") is not None or cached.get("publisher") is not None:
-            return cached
+        if _has_developer_or_publisher(entry):
+            return _details_from_entry(entry)
+    # Expired but complete entry with an ETag: ask the store whether it changed instead of refetching blindly
+    stale = None
+    headers = None
+    if use_cache and entry is None:
+        stale = appdetails_cache_get_stale_entry(app_id)
+        if stale is not None and stale.get("etag") and not stale.get("negative") and _has_developer_or_publisher(stale):
+            headers = {"If-None-Match": stale["etag"]}
+        else:
+            stale = None
     url = STEAM_APPDETAILS_URL_TEMPLATE.format(app_id=app_id)
+    _wait_for_request_slot()
     try:
-        resp = requests.get(url, timeout=15)
+        resp = _SESSION.get(url, timeout=15, headers=headers)
+        if resp.status_code == 304 and stale is not None:
+            appdetails_cache_touch(app_id)
+            return _details_from_entry(stale)
         resp.raise_for_status()
-        data = resp.json()
-        key = str(app_id)
-        if key not in data or not data[key].get("success"):
-            time.sleep(REQUEST_DELAY_SECONDS)
+        data = fast_json.loads(resp.content)
+        app_data = data.get(str(app_id)) if isinstance(data, dict) else None
+        if not isinstance(app_data, dict):
+            # null/odd body (e.g. while throttled): transient, so cache nothing
             return None
-        inner = data[key].get("data") or {}
+        if not app_data.get("success"):
+            # Store says it has no data for this app
+            if use_cache:
+                appdetails_cache_set_negative(app_id)
+            return None
+        inner = app_data.get("data") or {}
         release = inner.get("release_date") or {}
         if release.get("coming_soon"):
             date_str = None
@@ -129,27 +168,24 @@ def fetch_app_details_full(app_id: int | str, use_cache: bool = True) -> dict |
         screenshots_raw = inner.get("screenshots") or []
         screenshots = []
         for s in screenshots_raw[:4]:
-            path = (s or {}).get("path_full")
+            path = s.get("path_full") if s else None
             if path:
-                if not path.startswith("http"):
-                    path = "https://cdn.cloudflare.steamstatic.com" + (path if path.startswith("/") else "/" + path)
+                # Steam sends full https URLs; relative paths are CDN-relative
+                if path[0] == "/":
+                    path = STEAM_CDN_BASE + path
+                elif not path.startswith("http"):
+                    path = STEAM_CDN_BASE + "/" + path
                 screenshots.append(path)
         short_desc = (inner.get("short_description") or "").strip() or None
-        developers_raw = inner.get("developers") or []
-        if isinstance(developers_raw, dict):
-            developers_raw = list(developers_raw.values())
-        developer = ", ".join(str(x).strip() for x in developers_raw if x and str(x).strip()) or None
-        publishers_raw = inner.get("publishers") or []
-        if isinstance(publishers_raw, dict):
-            publishers_raw = list(publishers_raw.values())
-        publisher = ", ".join(str(x).strip() for x in publishers_raw if x and str(x).strip()) or None
+        developer = _normalize_str_list(inner.get("developers"))
+        publisher = _normalize_str_list(inner.get("publishers"))
         capsule_urls = _build_capsule_urls(app_id)
-        appdetails_cache_set_full(
-            app_id, date_str, screenshots,
-            short_description=short_desc, capsule_urls=capsule_urls,
-            developer=developer, publisher=publisher,
-        )
-        time.sleep(REQUEST_DELAY_SECONDS)
+        if use_cache:
+            appdetails_cache_set_full(
+                app_id, date_str, screenshots,
+                short_description=short_desc, capsule_urls=capsule_urls,
+                developer=developer, publisher=publisher, etag=resp.headers.get("ETag"),
+            )
         return {
             "release_date": date_str,
             "screenshots": screenshots,
@@ -157,5 +193,5 @@ def fetch_app_details_full(app_id: int | str, use_cache: bool = True) -> dict |
             "developer": developer,
             "publisher": publisher,
         }
-    except (requests.RequestException, KeyError, TypeError):
+    except (requests.RequestException, fast_json.JSONDecodeError, KeyError, TypeError):
         return None
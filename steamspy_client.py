@@ -1,99 +1,203 @@
 """Fetch SteamSpy appdetails (tags) with disk cache."""
 
-import json
+import atexit
 import os
-import re
+import threading
 import time
-from datetime import datetime, timedelta
 
 import requests
-
-from config import STEAMSPY_APPDETAILS_URL, STEAMSPY_CACHE_PATH, STEAMSPY_CACHE_TTL_HOURS
-
-REQUEST_DELAY_SECONDS = 0.3
-
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import fast_json
+from config import (
+    STEAMSPY_APPDETAILS_URL,
+    STEAMSPY_CACHE_PATH,
+    STEAMSPY_CACHE_TTL_HOURS,
+    STEAMSPY_NEGATIVE_TTL_MINUTES,
+)
+
+# Minimum spacing between SteamSpy requests, shared by all threads. SteamSpy allows 1 request/s for appdetails.
+REQUEST_DELAY_SECONDS = 1.0
+
+# Shared keep-alive session so repeated SteamSpy requests reuse connections instead of a TLS handshake each.
+_SESSION = requests.Session()
+_SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=16,
+        max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504]),
+    ),
+)
+
+# Monotonic time at which the next request may start. Waiting happens before a request, not after,
+# so cache hits and a caller's last fetch return without sleeping.
+_next_allowed = 0.0
+_rate_lock = threading.Lock()
+
+
+def _wait_for_request_slot() -> None:
+    """Block until this thread may send a request (spaced REQUEST_DELAY_SECONDS apart across threads)."""
+    global _next_allowed
+    with _rate_lock:
+        now = time.monotonic()
+        slot = max(now, _next_allowed)
+        _next_allowed = slot + REQUEST_DELAY_SECONDS
+    if slot > now:
+        time.sleep(slot - now)
+
+
+# Cache file used before the switch to JSONL; deleted on first load.
+_LEGACY_CACHE_PATH = os.path.join(os.path.dirname(STEAMSPY_CACHE_PATH), "steamspy_appdetails.json")
 # In-memory cache so we only read/parse the file once per process.
 _memory: dict | None = None
+# Entries fetched but not yet written; fetches only update memory, flush_steamspy_cache appends these in one go.
+_pending: dict[str, dict] = {}
+# Lines currently in the JSONL file (including superseded ones); drives compaction.
+_line_count = 0
+# Guards _memory and the cache file; enrich_with_steam_reviews fetches from several threads.
+_lock = threading.RLock()
 
 
 def _load_cache() -> dict:
-    """Load full cache from disk (or return in-memory copy). Returns dict app_id_str -> {tags, fetched_at}."""
-    global _memory
+    """
+    Load full cache from disk (or return in-memory copy). Returns dict app_id_str -> {tags, fetched_at}.
+    The file is JSONL, one {"app_id": ..., "entry": {...}} per line; later lines win.
+    """
+    global _memory, _line_count
     if _memory is not None:
         return _memory
-    if not os.path.isfile(STEAMSPY_CACHE_PATH):
-        _memory = {}
-        return _memory
-    try:
-        with open(STEAMSPY_CACHE_PATH, encoding="utf-8") as f:
-            _memory = json.load(f)
-        return _memory
-    except (json.JSONDecodeError, OSError):
-        _memory = {}
+    with _lock:
+        if _memory is not None:
+            return _memory
+        data: dict = {}
+        lines = 0
+        # The pre-JSONL cache file is never read; remove it once so it doesn't linger on disk
+        try:
+            os.remove(_LEGACY_CACHE_PATH)
+        except OSError:
+            pass
+        if os.path.isfile(STEAMSPY_CACHE_PATH):
+            try:
+                with open(STEAMSPY_CACHE_PATH, "rb") as f:
+                    for line in f:
+                        if not line.strip():
+                            continue
+                        lines += 1
+                        try:
+                            rec = fast_json.loads(line)
+                            data[str(rec["app_id"])] = dict(rec["entry"])
+                        except (fast_json.JSONDecodeError, KeyError, TypeError, ValueError):
+                            continue
+            except OSError:
+                data = {}
+                lines = 0
+        # Expired entries are never served, so leave them out of _memory (and the next compaction)
+        for key in [k for k, e in data.items() if _is_expired(e.get("fetched_at"), e.get("negative", False))]:
+            del data[key]
+        _line_count = lines
+        _memory = data
         return _memory
 
 
-def _save_cache(data: dict) -> None:
-    """Write cache to disk and update in-memory cache."""
-    global _memory
+def _write_entries(entries: dict[str, dict]) -> None:
+    """Append entry lines to the cache file in one open; compact once superseded lines outnumber live entries. Call with _lock held."""
+    global _line_count
     dirpath = os.path.dirname(STEAMSPY_CACHE_PATH)
     if dirpath and not os.path.isdir(dirpath):
         os.makedirs(dirpath, exist_ok=True)
-    with open(STEAMSPY_CACHE_PATH, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=0)
-    _memory = data
+    with open(STEAMSPY_CACHE_PATH, "ab") as f:
+        f.writelines(fast_json.dumps({"app_id": key, "entry": entry}) + b"\n" for key, entry in entries.items())
+    _line_count += len(entries)
+    if _line_count > 2 * len(_load_cache()):
+        _compact_cache()
 
 
-def _is_expired(fetched_at: str) -> bool:
-    try:
-        dt = datetime.fromisoformat(fetched_at.replace("Z", ""))
-    except (ValueError, TypeError):
+def flush_steamspy_cache() -> None:
+    """Write entries fetched since the last flush to disk. Call after a batch of fetches; also registered to run at exit."""
+    with _lock:
+        if not _pending:
+            return
+        entries = dict(_pending)
+        _pending.clear()
+        _write_entries(entries)
+
+
+atexit.register(flush_steamspy_cache)
+
+
+def _compact_cache() -> None:
+    """Rewrite the cache file with one line per live entry (via a temp file + os.replace). Call with _lock held."""
+    global _line_count
+    data = _load_cache()
+    tmp_path = STEAMSPY_CACHE_PATH + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.writelines(fast_json.dumps({"app_id": key, "entry": entry}) + b"\n" for key, entry in data.items())
+    os.replace(tmp_path, STEAMSPY_CACHE_PATH)
+    _line_count = len(data)
+
+
+_TTL_SECONDS = STEAMSPY_CACHE_TTL_HOURS * 3600
+# Entries with "negative": True record a failed fetch; they expire much sooner so the app is retried.
+_NEGATIVE_TTL_SECONDS = STEAMSPY_NEGATIVE_TTL_MINUTES * 60
+
+
+def _is_expired(fetched_at: int, negative: bool = False) -> bool:
+    """True if an entry fetched at fetched_at (epoch seconds) is past the TTL; a missing or non-numeric value counts as expired."""
+    if not isinstance(fetched_at, (int, float)):
         return True
-    return (datetime.utcnow() - dt) > timedelta(hours=STEAMSPY_CACHE_TTL_HOURS)
+    return int(time.time()) - fetched_at > (_NEGATIVE_TTL_SECONDS if negative else _TTL_SECONDS)
 
 
 def _parse_owners_to_estimate(owners_str: str) -> int | None:
     """Parse SteamSpy owners string like '1,000,000 .. 2,000,000' to midpoint integer, or None."""
     if not owners_str or not isinstance(owners_str, str):
         return None
-    s = owners_str.strip()
-    if ".." in s:
-        parts = s.split("..", 1)
-        low = re.sub(r"[^\d]", "", parts[0].strip())
-        high = re.sub(r"[^\d]", "", parts[1].strip())
-        try:
-            lo, hi = int(low or "0"), int(high or "0")
-            return (lo + hi) // 2 if (lo or hi) else None
-        except ValueError:
-            return None
-    try:
-        return int(re.sub(r"[^\d]", "", s) or "0") or None
-    except ValueError:
-        return None
+    # One pass: accumulate digits (skipping separators); the first ".." closes the low bound
+    lo = cur = 0
+    saw_dots = False
+    prev = ""
+    for ch in owners_str:
+        if "0" <= ch <= "9":
+            cur = cur * 10 + ord(ch) - 48
+        elif ch == "." and prev == "." and not saw_dots:
+            saw_dots = True
+            lo, cur = cur, 0
+        prev = ch
+    if saw_dots:
+        return (lo + cur) // 2 if (lo or cur) else None
+    return cur or None
 
 
 def fetch_steamspy_appdetails(app_id: int | str, use_cache: bool = True) -> dict:
     """
     Fetch SteamSpy appdetails for the given app_id.
-    Returns dict with keys: tags (list[str]), owners_estimate (int | None), ccu (int | None), fetched_at (str).
-    Cached to disk. On error returns {tags: [], owners_estimate: None, ccu: None}.
+    Returns dict with keys: tags (list[str]), owners_estimate (int | None), ccu (int | None), fetched_at (int, epoch seconds; 0 on error).
+    Cached in memory at once and on disk at the next flush_steamspy_cache(). On error returns {tags: [], owners_estimate: None, ccu: None}.
     """
     app_id = int(app_id)
     key = str(app_id)
-    empty = {"tags": [], "owners_estimate": None, "ccu": None, "fetched_at": ""}
-    if use_cache:
-        data = _load_cache()
-        if key in data and not _is_expired(data[key].get("fetched_at", "")):
-            cached = data[key]
+    empty = {"tags": [], "owners_estimate": None, "ccu": None, "fetched_at": 0}
+    # Bound once: the same dict serves the hit check and receives the fetched entry
+    data = _load_cache() if use_cache else None
+    if data is not None:
+        cached = data.get(key)
+        if cached is not None and not _is_expired(cached.get("fetched_at"), cached.get("negative", False)):
+            # Fetch failed recently; don't hit SteamSpy again until the negative entry expires
+            if cached.get("negative"):
+                return empty
             if "owners_estimate" in cached and "ccu" in cached:
                 return dict(cached)
     url = STEAMSPY_APPDETAILS_URL.format(app_id=app_id)
+    _wait_for_request_slot()
     try:
-        resp = requests.get(url, timeout=15)
+        resp = _SESSION.get(url, timeout=15)
         resp.raise_for_status()
-        body = resp.json()
+        body = fast_json.loads(resp.content)
         tags_obj = body.get("tags")
-        tag_names = [str(k).strip() for k in tags_obj.keys() if k and str(k).strip()] if isinstance(tags_obj, dict) else []
+        # JSON object keys are always str: strip each once and drop blanks
+        tag_names = [t for t in (k.strip() for k in tags_obj) if t] if isinstance(tags_obj, dict) else []
         owners_raw = body.get("owners")
         owners_estimate = _parse_owners_to_estimate(owners_raw) if owners_raw else None
         ccu = body.get("ccu")
@@ -102,15 +206,18 @@ def fetch_steamspy_appdetails(app_id: int | str, use_cache: bool = True) -> dict
                 ccu = int(ccu)
             except (TypeError, ValueError):
                 ccu = None
-        fetched_at = datetime.utcnow().isoformat() + "Z"
-        result = {"tags": tag_names, "owners_estimate": owners_estimate, "ccu": ccu, "fetched_at": fetched_at}
-        if use_cache:
-            data = _load_cache()
-            data[key] = result
-            _save_cache(data)
-        time.sleep(REQUEST_DELAY_SECONDS)
+        result = {"tags": tag_names, "owners_estimate": owners_estimate, "ccu": ccu, "fetched_at": int(time.time())}
+        if data is not None:
+            with _lock:
+                data[key] = result
+                _pending[key] = result
         return result
-    except (requests.RequestException, KeyError, TypeError, ValueError):
+    except (requests.RequestException, KeyError, TypeError, ValueError, AttributeError):
+        if data is not None:
+            negative = {**empty, "fetched_at": int(time.time()), "negative": True}
+            with _lock:
+                data[key] = negative
+                _pending[key] = negative
         return empty
 
 
@@ -121,7 +228,10 @@ def fetch_steamspy_tags(app_id: int | str, use_cache: bool = True) -> list[str]:
 
 def clear_steamspy_cache() -> None:
     """Remove SteamSpy cache file from disk and in-memory cache."""
-    global _memory
-    _memory = None
-    if os.path.isfile(STEAMSPY_CACHE_PATH):
-        os.remove(STEAMSPY_CACHE_PATH)
+    global _memory, _line_count
+    with _lock:
+        _memory = None
+        _line_count = 0
+        _pending.clear()
+        if os.path.isfile(STEAMSPY_CACHE_PATH):
+            os.remove(STEAMSPY_CACHE_PATH)
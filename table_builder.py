@@ -1,30 +1,21 @@
 """Build Reddit markdown table from product list and selected currencies."""
 
-from config import CURRENCY_LABELS, COUPON_MULTIPLIER
-
-
-def _base_price(variant: dict) -> float:
-    """Price to use for display: discountPrice if present, else originalPrice."""
-    base = variant.get("discountPrice")
-    if base is not None:
-        return float(base)
-    return float(variant.get("originalPrice", 0))
+import io
+from functools import lru_cache
 
-
-def _percent_off_with_code(variant: dict) -> int:
-    """Compute % off after 10% coupon: (1 - final/original)*100 rounded."""
-    original = float(variant.get("originalPrice", 0))
-    if original <= 0:
-        return 0
-    base = _base_price(variant)
-    final = base * COUPON_MULTIPLIER
-    return round((1 - final / original) * 100)
+from config import CURRENCY_LABELS, COUPON_MULTIPLIER
 
 
-def _variant_for_percent(product: dict) -> dict | None:
-    """Pick one variant to compute % off (always USD for Deal Table)."""
-    by_curr = product.get("variants_by_currency") or {}
-    return by_curr.get("USD")
+@lru_cache(maxsize=32)
+def _header(currencies: tuple[str, ...]) -> tuple[str, str]:
+    """Header and separator lines (each ending in a newline) for a currency column set."""
+    # Header: Deals | Platform | % Off w/ code | <currency cols> | Types
+    header_cells = ["Deals", "Platform", "% Off w/ code"]
+    for code in currencies:
+        header_cells.append(CURRENCY_LABELS.get(code, code))
+    header_cells.append("Types")
+    sep = " | "
+    return "| " + sep.join(header_cells) + " |\n", "| " + sep.join(["---"] * len(header_cells)) + " |\n"
 
 
 def build_reddit_table(
@@ -39,46 +30,64 @@ def build_reddit_table(
     if not products:
         return ""
 
-    # Header: Deals | Platform | % Off w/ code | <currency cols> | Types
-    header_cells = ["Deals", "Platform", "% Off w/ code"]
-    for code in currencies:
-        header_cells.append(CURRENCY_LABELS.get(code, code))
-    header_cells.append("Types")
+    header, separator = _header(tuple(currencies))
     sep = " | "
-    header = "| " + sep.join(header_cells) + " |"
-    separator = "| " + sep.join(["---"] * len(header_cells)) + " |"
-    rows = [header, separator]
-
+    # Rows are written straight into one buffer rather than collected in a list and joined
+    buf = io.StringIO()
+    buf.write(header)
+    buf.write(separator)
+    n_cells = len(currencies) + 4  # Deals, Platform, % Off, <currencies>, Types
+
+    # Hot loop: price helpers are inlined and lookups bound to locals
+    mult = COUPON_MULTIPLIER
+    currency_cols = tuple(enumerate(currencies, 3))
     for product in products:
-        title = product.get("title", "").strip() or "Unknown"
-        link = product.get("link", "").strip()
-        platform = product.get("platform", "").strip() or "N/A"
-        by_curr = product.get("variants_by_currency") or {}
-
-        # % off: from one variant (USD or first)
-        variant_for_pct = _variant_for_percent(product)
-        pct_str = "0%"
-        if variant_for_pct:
-            pct_str = f"{_percent_off_with_code(variant_for_pct)}%"
+        get = product.get
+        title = get("title", "").strip() or "Unknown"
+        link = get("link", "").strip()
+        platform = get("platform", "").strip() or "N/A"
+        by_curr_get = (get("variants_by_currency") or {}).get
+
+        # % off after coupon: (1 - final/original)*100 rounded, always from the USD variant.
+        # Display price is discountPrice if present, else originalPrice.
+        usd = by_curr_get("USD")
+        if usd:
+            original = float(usd.get("originalPrice", 0))
+            if original <= 0:
+                pct_str = "0%"
+            else:
+                base = usd.get("discountPrice")
+                base = float(base if base is not None else usd.get("originalPrice", 0))
+                pct_str = f"{round((1 - base * mult / original) * 100)}%"
         else:
             pct_str = "N/A"
 
         # Reddit link for title
         deal_cell = f"[{title}]({link})" if link else title
-
-        cells = [deal_cell, platform, pct_str]
-        for code in currencies:
-            v = by_curr.get(code)
+        # Escape pipe in cell text for Reddit (if title contains |). Only the free-text cells can hold one;
+        # percent, price and type cells never do, so they skip the scan.
+        if "|" in deal_cell:
+            deal_cell = deal_cell.replace("|", "\\|")
+        if "|" in platform:
+            platform = platform.replace("|", "\\|")
+
+        cells = [None] * n_cells
+        cells[0] = deal_cell
+        cells[1] = platform
+        cells[2] = pct_str
+        for i, code in currency_cols:
+            v = by_curr_get(code)
             if v is None:
-                cells.append("N/A")
+                cells[i] = "N/A"
             else:
-                base = _base_price(v)
-                final = round(base * COUPON_MULTIPLIER, 2)
-                cells.append(f"{final:.2f}")
-        cells.append("Steam")
+                base = v.get("discountPrice")
+                if base is None:
+                    base = v.get("originalPrice", 0)
+                cells[i] = f"{round(float(base) * mult, 2):.2f}"
+        cells[-1] = "Steam"
 
-        # Escape pipe in cell text for Reddit (if title contains |)
-        cells_escaped = [str(c).replace("|", "\\|") for c in cells]
-        rows.append("| " + sep.join(cells_escaped) + " |")
+        buf.write("| ")
+        buf.write(sep.join(cells))
+        buf.write(" |\n")
 
-    return "\n".join(rows)
+    return buf.getvalue().rstrip("\n")